@@ -0,0 +1,29 @@
+"""
+Atomic file replacement: write under a temporary name next to the target, then
+os.replace it into place, so readers only ever see the old file or the complete
+new one. Standard library only, since daily_setup.py uses it.
+"""
+import os
+from contextlib import contextmanager
+from pathlib import Path
+
+@contextmanager
+def atomic_path(path):
+    """
+    Yields a temporary path next to `path` to write to (e.g. for np.lib.format.open_memmap);
+    it replaces `path` when the block succeeds and is removed if it fails.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+@contextmanager
+def atomic_write(path, mode="w", **kwargs):
+    """Like open(path, mode), but the file only replaces `path` once it has been written completely."""
+    with atomic_path(path) as tmp_path:
+        with open(tmp_path, mode, **kwargs) as f:
+            yield f
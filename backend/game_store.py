@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time as clock
+from collections import OrderedDict
+from datetime import date, datetime, time, timedelta
+
+from game_data import validate_game
+from metrics import GAME_CACHE_HITS, GAME_CACHE_MISSES, GAME_LOAD_SECONDS
+
+# Days without a game are remembered this long, so requests for them don't each
+# re-read the manifest and probe the disk
+MISSING_GAME_TTL = 5.0
+
+class GameStore:
+    """
+    Bounded LRU of loaded games keyed by date. `loader` maps a date to its game
+    (or None if that day has no game); loaded games are validated before they are
+    cached; days without a game are remembered for MISSING_GAME_TTL seconds. Today's
+    game is additionally held in a single (date, game) reference so the midnight
+    rollover is one atomic assignment.
+    """
+
+    def __init__(self, loader, max_days=4, missing_ttl=MISSING_GAME_TTL):
+        self._loader = loader
+        self._games = OrderedDict()
+        # day -> monotonic time until which it is known to have no game
+        self._missing = {}
+        self.missing_ttl = missing_ttl
+        self._lock = threading.Lock()
+        self._current = None
+        self.max_days = max_days
+
+    def get(self, day):
+        """Returns the game for `day`, loading it on a miss. None if it doesn't exist."""
+        with self._lock:
+            game = self._games.get(day)
+            if game is not None:
+                self._games.move_to_end(day)
+                GAME_CACHE_HITS.inc()
+                return game
+            if self._missing.get(day, 0) > clock.monotonic():
+                GAME_CACHE_HITS.inc()
+                return None
+
+        # Load outside the lock so a slow disk read doesn't block other days
+        GAME_CACHE_MISSES.inc()
+        with GAME_LOAD_SECONDS.time():
+            game = self._loader(day)
+            if game is None:
+                with self._lock:
+                    if len(self._missing) > 1024: # Arbitrary dates shouldn't grow this forever
+                        self._missing.clear()
+                    self._missing[day] = clock.monotonic() + self.missing_ttl
+                return None
+            validate_game(game)
+            # Build the rank -> word index up front so hints never pay for it
+            game.ensure_order()
+
+        with self._lock:
+            self._missing.pop(day, None)
+            self._games[day] = game
+            self._games.move_to_end(day)
+            while len(self._games) > self.max_days:
+                self._games.popitem(last=False)
+        return game
+
+    def today(self):
+        """Returns today's game, re-keyed by date so it can never serve a stale day."""
+        current = self._current
+        day = date.today()
+        if current is not None and current[0] == day:
+            GAME_CACHE_HITS.inc()
+            return current[1]
+
+        game = self.get(day)
+        if game is not None:
+            self._current = (day, game)
+        return game
+
+    def activate(self, day, game):
+        self._current = (day, game)
+
+    def clear(self):
+        with self._lock:
+            self._games.clear()
+            self._missing.clear()
+        self._current = None
+
+async def run_rollover(store, preload_lead=timedelta(minutes=5)):
+    """
+    Background task: loads and validates tomorrow's game `preload_lead` before
+    midnight, then swaps it in as today's game right at rollover.
+    """
+    while True:
+        now = datetime.now()
+        tomorrow = now.date() + timedelta(days=1)
+        midnight = datetime.combine(tomorrow, time.min)
+
+        await asyncio.sleep(max(0.0, (midnight - preload_lead - now).total_seconds()))
+        try:
+            game = await asyncio.to_thread(store.get, tomorrow)
+        except Exception as e:
+            print(f"Failed to preload game for {tomorrow}: {e}")
+            game = None
+        if game is None:
+            print(f"No valid game found for {tomorrow}; it will be loaded on first request.")
+
+        # Sleep until just past midnight, then swap
+        await asyncio.sleep(max(0.0, (midnight - datetime.now()).total_seconds()) + 0.01)
+        if game is not None:
+            store.activate(tomorrow, game)
+            print(f"Activated preloaded game for {tomorrow}.")
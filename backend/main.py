@@ -1,55 +1,177 @@
+import asyncio
 import json
 import os
+import secrets
+import sys
+import time
 from datetime import date
 from pathlib import Path
-from fastapi import FastAPI, HTTPException, Body
+from fastapi import FastAPI, HTTPException, Body, Query, Request, Response
 from functools import lru_cache
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.staticfiles import StaticFiles
-from pydantic import BaseModel
-from redis import from_url
+from fastapi.responses import FileResponse
+from pydantic import BaseModel, Field
+from redis.asyncio import BlockingConnectionPool, Redis
 from contextlib import asynccontextmanager
-import subprocess
+
+# Shared game-data helpers live at the repo root, next to the generation scripts
+sys.path.append(str(Path(__file__).parent.parent.resolve()))
+from game_data import VOCAB_FILENAME, RANKS_FILENAME, JSON_FILENAME, GameLookup, load_game, load_vocab
+from embed_store import load_vectors
+from word_lists import read_words
+from game_store import GameStore, run_rollover
+from daily_setup import activate_next_game, read_manifest
+from suggestions import SuggestionIndex
+from practice import load_practice_ranker
+from shared_data import attach, fingerprint, prune
+from image_variants import IMAGE_MANIFEST_FILENAME, SOURCE_FILENAME, MEDIA_TYPES, load_image_manifest
+from metrics import GUESSES, REDIS_LATENCY, MetricsMiddleware, render_metrics
+from write_buffer import WriteBehindBuffer
+from leaderboard_archive import archive_page, archive_path, archived_days, read_archive
+
+# Past days a player can browse in the archive without forcing reloads. Each
+# worker keeps that many games loaded plus today's and tomorrow's preload, and the
+# same number stay published in shared memory (~100 KB of mapped pages per day).
+ARCHIVE_BROWSE_DAYS = 30
+CACHED_GAME_DAYS = ARCHIVE_BROWSE_DAYS + 2
+
+# Most words accepted by a single bulk guess request. Enough to replay any
+# realistic game history in one round trip; larger batches must be split.
+MAX_BULK_GUESSES = 500
+
+# Leaderboard pages: default/maximum page size and how long a page may be served
+# from the in-process cache before it is re-read from KV.
+LEADERBOARD_PAGE_SIZE = 10
+MAX_LEADERBOARD_PAGE_SIZE = 100
+LEADERBOARD_CACHE_TTL = 1.0
+
+# KV connections shared by all requests of a worker. When every connection is busy,
+# requests queue for up to KV_POOL_TIMEOUT seconds instead of opening new ones.
+KV_MAX_CONNECTIONS = int(os.getenv("KV_MAX_CONNECTIONS", "50"))
+KV_POOL_TIMEOUT = 5.0
+
+# Image URLs carry a hash of their content, so browsers and CDNs may keep them forever
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
 # --- Pydantic Models for Request/Response validation ---
 class GuessRequest(BaseModel):
     word: str
+    sessionId: str | None = None # Only used to group guess events for analytics
+
+class HintResponse(BaseModel):
+    word: str
+    rank: int
+
+class PracticeRequest(BaseModel):
+    seed: int | None = None # Replays a specific random practice game
+    word: str | None = None # Practices a chosen target word instead
+
+class PracticeGameResponse(BaseModel):
+    gameId: str
+    totalWords: int
+
+class BulkGuessRequest(BaseModel):
+    words: list[str] = Field(..., max_length=MAX_BULK_GUESSES)
+    sessionId: str | None = None # Only used to group guess events for analytics
+
+class ImageSource(BaseModel):
+    type: str # e.g. "image/avif", for a <picture> <source> element
+    srcset: str
 
 class GameInfoResponse(BaseModel):
     imageUrl: str
     totalWords: int
+    srcset: str | None = None # WebP variants by width
+    sources: list[ImageSource] = []
 
 class LeaderboardEntry(BaseModel):
     username: str
     score: int
     sessionId: str | None = None
 
+class PlayerRankResponse(BaseModel):
+    username: str
+    sessionId: str | None = None
+    score: int
+    position: int # 1-based place on today's leaderboard
+    totalPlayers: int
+
 class GuessResponse(BaseModel):
     status: str
     message: str | None = None
     rank: int | None = None
     isCorrect: bool | None = None
+    suggestions: list[str] | None = None # "Did you mean" corrections for not_in_list guesses
 
 # --- Configuration & Helper Functions ---
 BACKEND_ROOT = Path(__file__).parent.resolve()
-LOOKUP_DIR = BACKEND_ROOT / "lookup_files"
+PREGEN_DIR = BACKEND_ROOT / "pregen_data"
+WORD_LIST_PATH = BACKEND_ROOT.parent / "word_list.txt"
+EMBED_STORE_PATH = BACKEND_ROOT.parent / "embed_store.npy"
+VECTORS_PATH = BACKEND_ROOT.parent / "embed_vectors.npy"
+DRAWABLE_LIST_PATH = BACKEND_ROOT.parent / "drawable_words.txt"
+
+# Set once startup activation has finished; reported by /healthz
+startup_state = {"ready": False}
+
+async def activate_todays_game():
+    """Activates today's game in a worker thread if needed, without blocking startup."""
+    try:
+        # Check if today's game has been activated
+        manifest = read_manifest()
+        if manifest is None or manifest.get("date") != str(date.today()):
+            print("Today's game not found. Activating it in the background...")
+            # Only points the manifest at today's game; the leaderboard is left alone
+            await asyncio.to_thread(activate_next_game)
+            # Requests that arrived before activation may have cached "no game today"
+            game_store.clear()
+        # Warm the store so the first guess doesn't pay for the load
+        await asyncio.to_thread(game_store.today)
+    except Exception as e:
+        print(f"Error activating today's game: {e}")
+    finally:
+        startup_state["ready"] = True
+
+async def build_suggestion_index():
+    """Builds the "did you mean" index in a worker thread; guesses before then get no suggestions."""
+    try:
+        await asyncio.to_thread(load_suggestion_index)
+    except Exception as e:
+        print(f"Error building suggestion index: {e}")
+
+async def load_practice():
+    """Loads the embeddings for practice games in a worker thread, if they are deployed."""
+    # Either store will do; deployments can ship just the smaller quantized one
+    if not (VECTORS_PATH.exists() or EMBED_STORE_PATH.exists()) or not WORD_LIST_PATH.exists():
+        print("No embedding store found; practice games are disabled.")
+        return
+    try:
+        practice_state["ranker"] = await asyncio.to_thread(load_shared_practice_ranker)
+    except Exception as e:
+        print(f"Error loading practice embeddings: {e}")
 
 # --- FastAPI App Initialization ---
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Run daily setup if needed
-    try:
-        # Check if today's game exists
-        current_date_str = str(date.today())
-        lookup_path = LOOKUP_DIR / f"lookup_{current_date_str}.json"
-        if not lookup_path.exists():
-            print("Today's game not found. Running daily_setup.py...")
-            # Use absolute path to ensure it runs regardless of CWD
-            daily_setup_path = BACKEND_ROOT.parent / "daily_setup.py"
-            subprocess.run(["python", str(daily_setup_path)], check=True)
-    except Exception as e:
-        print(f"Error running daily setup: {e}")
+    # Startup: activate today's game if needed while already serving requests
+    activation_task = asyncio.create_task(activate_todays_game())
+    suggestion_task = asyncio.create_task(build_suggestion_index())
+    practice_task = asyncio.create_task(load_practice())
+    # Keep tomorrow's game preloaded and swap it in at midnight
+    rollover_task = asyncio.create_task(run_rollover(game_store))
+    # Leaderboard submissions and guess events are written to KV in the background
+    flush_task = asyncio.create_task(write_buffer.run(redis_client)) if redis_client is not None else None
     yield
+    activation_task.cancel()
+    suggestion_task.cancel()
+    practice_task.cancel()
+    rollover_task.cancel()
+    if flush_task is not None:
+        # Drain buffered writes before the connection pool goes away
+        write_buffer.stop()
+        await flush_task
+    if redis_client is not None:
+        await redis_client.aclose()
 
 app = FastAPI(title="Pixelo API", lifespan=lifespan)
 
@@ -63,44 +185,222 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Per-route request counts and latency, exposed at /metrics
+app.add_middleware(MetricsMiddleware)
+
 # --- Redis Client (for Vercel KV) ---
+# Async and pooled: a KV round trip never holds a threadpool thread
 redis_client = None
 if os.getenv("KV_URL"):
-    redis_client = from_url(os.getenv("KV_URL"))
+    redis_client = Redis(connection_pool=BlockingConnectionPool.from_url(
+        os.getenv("KV_URL"), max_connections=KV_MAX_CONNECTIONS, timeout=KV_POOL_TIMEOUT,
+    ))
+
+# Batches leaderboard writes and guess events into periodic pipelines; cached
+# leaderboard pages are dropped once a batch has landed
+write_buffer = WriteBehindBuffer(on_flush=lambda: invalidate_leaderboard_cache())
+
+@lru_cache(maxsize=1)
+def get_vocab():
+    """Memory-maps the shared vocabulary used by every binary game (None if absent)."""
+    vocab_path = PREGEN_DIR / VOCAB_FILENAME
+    return load_vocab(vocab_path) if vocab_path.exists() else None
+
+def resolve_game_dir(day):
+    """
+    Resolves the pregenerated directory holding a date's game: the one named in the
+    activation manifest for that date, otherwise pregen_data/<date>.
+    """
+    manifest = read_manifest()
+    if manifest is not None and manifest.get("date") == str(day):
+        return PREGEN_DIR / manifest["gameDir"]
+    day_dir = PREGEN_DIR / str(day)
+    return day_dir if day_dir.exists() else None
+
+def load_game_for_date(day):
+    """
+    Loads the lookup table for a date. The first worker to need a day publishes its
+    ranks and inverse index to shared memory (parsing legacy JSON lookups only
+    once); every worker then memory-maps the same pages.
+    """
+    game_dir = resolve_game_dir(day)
+    if game_dir is None:
+        return None
+    source = game_dir / RANKS_FILENAME
+    if not source.exists():
+        source = game_dir / JSON_FILENAME
+    if not source.exists():
+        return None
 
-# --- Static File Serving ---
-# This makes the generated images accessible via a URL
-STATIC_DIR = Path(__file__).parent / "static"
-app.mount("/static", StaticFiles(directory=STATIC_DIR), name="static")
+    def build():
+        game = load_game(game_dir, get_vocab())
+        arrays = {"ranks": game.ranks, "order": game.ensure_order()}
+        if game.vocab is not get_vocab():
+            arrays["vocab"] = game.vocab # Legacy JSON games carry their own vocabulary
+        return arrays
+
+    arrays = attach(f"game-{day}", fingerprint(source, PREGEN_DIR / VOCAB_FILENAME), build)
+    prune("game-", CACHED_GAME_DAYS)
+    vocab = arrays["vocab"] if "vocab" in arrays else get_vocab()
+    return GameLookup(vocab, arrays["ranks"], arrays["order"])
+
+# Today's game plus tomorrow's preload and recently played archive days
+game_store = GameStore(load_game_for_date, max_days=CACHED_GAME_DAYS)
 
-@lru_cache(maxsize=2) # Cache today's and yesterday's lookup for a short period after midnight
 def get_daily_lookup():
-    """Loads the lookup table for the current day."""
-    current_date_str = str(date.today())
-    lookup_path = LOOKUP_DIR / f"lookup_{current_date_str}.json"
+    """Returns the lookup table for the current day."""
+    return game_store.today()
+
+# Set once the suggestion index has been built at startup
+suggestion_state = {"index": None}
+
+def load_suggestion_index():
+    # word_list.txt is frequency ordered, which makes it the better tie-breaker
+    if WORD_LIST_PATH.exists():
+        source = WORD_LIST_PATH
+        words = read_words(WORD_LIST_PATH)
+    elif get_vocab() is not None:
+        source = PREGEN_DIR / VOCAB_FILENAME
+        words = [word.decode("utf-8") for word in get_vocab().tolist()]
+    else:
+        print("No word list available; guesses will not get suggestions.")
+        return
+    # Built by one worker, memory-mapped by all
+    arrays = attach("suggestions", fingerprint(source), lambda: SuggestionIndex.build(words).arrays())
+    suggestion_state["index"] = SuggestionIndex.from_arrays(words, arrays)
 
-    if not lookup_path.exists():
+def suggest_words(word, lookup):
+    """Up to three close spellings of `word` that the given game can score."""
+    index = suggestion_state["index"]
+    if index is None:
         return None
+    suggestions = index.suggest(word)
+    if not suggestions:
+        return None
+    known = lookup.ranks_for(suggestions) >= 0
+    return [suggestion for suggestion, ok in zip(suggestions, known) if ok] or None
+
+# Set once the practice embeddings have been loaded at startup
+practice_state = {"ranker": None}
+
+def load_shared_practice_ranker():
+    """
+    Practice ranker over the vectors decoded to float32, published once to shared
+    memory: one copy per host (~40 MB for 25k words), and no per-request decoding.
+    """
+    arrays = attach(
+        "practice",
+        # Tagged with the format, so a host never attaches to an older publication of the quantized codes
+        f"{fingerprint(WORD_LIST_PATH, VECTORS_PATH, EMBED_STORE_PATH)}-float32",
+        lambda: {"vectors": load_vectors(WORD_LIST_PATH, VECTORS_PATH, EMBED_STORE_PATH)[1].decode()},
+    )
+    return load_practice_ranker(WORD_LIST_PATH, arrays["vectors"], DRAWABLE_LIST_PATH)
 
-    with open(lookup_path, "r") as f:
-        return json.load(f)
+def get_practice_lookup(game_id):
+    """
+    Resolves a practice game id to its (cached) lookup. Ids are "r<seed>" for random
+    games and "t<index>" for a chosen target; they are not meant to be secret.
+    """
+    ranker = practice_state["ranker"]
+    if ranker is None:
+        raise HTTPException(status_code=503, detail="Practice games are not available right now.")
+
+    kind, value = game_id[:1], game_id[1:]
+    # isdigit() alone also accepts Unicode digits like "²", which int() rejects
+    if not (value.isascii() and value.isdigit()) or kind not in ("r", "t"):
+        raise HTTPException(status_code=404, detail="Unknown practice game.")
+    target_index = ranker.target_for_seed(int(value)) if kind == "r" else int(value)
+    if target_index >= len(ranker.words):
+        raise HTTPException(status_code=404, detail="Unknown practice game.")
+    return ranker.lookup_for_target(target_index)
+
+def hint_for(lookup, rank=None, best=None):
+    """
+    Answers a hint from the inverse rank index in O(1): either the word at `rank`
+    or the next word better than the player's `best` rank. The target itself
+    (rank 0) is never revealed.
+    """
+    if (rank is None) == (best is None):
+        raise HTTPException(status_code=400, detail="Ask for exactly one of 'rank' or 'best'.")
+    if best is not None:
+        rank = best - 1
+    if rank < 1:
+        raise HTTPException(status_code=400, detail="No hint available: that would reveal the word.")
+    if rank >= len(lookup):
+        raise HTTPException(status_code=400, detail=f"Rank must be below {len(lookup)}.")
+    return {"word": lookup.word_at(rank), "rank": rank}
+
+def guess_result(rank, suggestions=None):
+    """Builds the guess response for a word's rank (None if the word is unknown)."""
+    if rank is None:
+        GUESSES.inc(("not_in_list",))
+        return {"status": "not_in_list", "message": "Word not in our dictionary.", "suggestions": suggestions}
+    GUESSES.inc(("found",))
+    return {"status": "found", "rank": rank, "isCorrect": rank == 0}
+
+def score_guess(lookup, word, game=None, session_id=None):
+    """
+    Scores one guess, attaching spelling suggestions when the word is unknown. With
+    a `game` label the guess is also recorded as an analytics event (buffered).
+    """
+    rank = lookup.get(word)
+    if game is not None and redis_client is not None:
+        write_buffer.add_guess(game, word, rank, session_id)
+    return guess_result(rank, suggest_words(word, lookup) if rank is None else None)
 
 # --- API Routes ---
 
-@app.get("/api/game/today", response_model=GameInfoResponse)
-def get_game_info():
-    """Provides the URL for today's image and total word count."""
-    current_date_str = str(date.today())
-    image_path_on_disk = STATIC_DIR / "images" / f"img_{current_date_str}.png"
+@lru_cache(maxsize=16)
+def _cached_image_manifest(game_dir, stamp):
+    return load_image_manifest(game_dir)
 
-    lookup = get_daily_lookup()
+def get_image_manifest(game_dir):
+    """Returns a day's image manifest, re-read only when images.json/image.png change."""
+    stamp_path = game_dir / IMAGE_MANIFEST_FILENAME
+    if not stamp_path.exists():
+        stamp_path = game_dir / SOURCE_FILENAME
+    if not stamp_path.exists():
+        return None
+    return _cached_image_manifest(game_dir, stamp_path.stat().st_mtime_ns)
 
-    if not image_path_on_disk.exists() or lookup is None:
-        raise HTTPException(status_code=404, detail="Today's game has not been generated yet. Please run the daily_setup.py script.")
+def game_info(day, lookup):
+    """Builds the image URLs and word count for a day's game, or None if it's incomplete."""
+    game_dir = resolve_game_dir(day)
+    manifest = get_image_manifest(game_dir) if game_dir is not None else None
+    if manifest is None or lookup is None:
+        return None
 
-    image_url = f"/static/images/img_{current_date_str}.png"
+    base_url = f"/api/game/image/{day}/"
+    srcsets = {}
+    for variant in manifest["variants"]:
+        srcsets.setdefault(variant["format"], []).append(f"{base_url}{variant['name']} {variant['width']}w")
+    sources = [{"type": MEDIA_TYPES[fmt], "srcset": ", ".join(candidates)} for fmt, candidates in srcsets.items()]
+
+    image_url = base_url + manifest["source"]["name"]
     total_words = len(lookup)
-    return {"imageUrl": image_url, "totalWords": total_words}
+    return {
+        "imageUrl": image_url,
+        "totalWords": total_words,
+        "srcset": ", ".join(srcsets["webp"]) if "webp" in srcsets else None,
+        "sources": sources,
+    }
+
+def get_archived_lookup(day):
+    """Returns the lookup for a past (or today's) game; future games are never served."""
+    if day > date.today():
+        raise HTTPException(status_code=404, detail="This game isn't available yet.")
+    lookup = game_store.get(day)
+    if lookup is None:
+        raise HTTPException(status_code=404, detail=f"No game found for {day}.")
+    return lookup
+
+@app.get("/api/game/today", response_model=GameInfoResponse)
+def get_game_info():
+    """Provides the URL for today's image and total word count."""
+    info = game_info(date.today(), get_daily_lookup())
+    if info is None:
+        raise HTTPException(status_code=404, detail="Today's game has not been generated yet. Please run the daily_setup.py script.")
+    return info
 
 @app.post("/api/game/guess", response_model=GuessResponse)
 def process_guess(guess_request: GuessRequest):
@@ -109,53 +409,276 @@ def process_guess(guess_request: GuessRequest):
     if lookup is None:
         raise HTTPException(status_code=503, detail="Game data is not available for today. Please run daily_setup.py.")
 
-    if guess_request.word not in lookup:
-        return {"status": "not_in_list", "message": "Word not in our dictionary."}
+    return score_guess(lookup, guess_request.word, str(date.today()), guess_request.sessionId)
 
-    rank = lookup[guess_request.word]
-    is_correct = (rank == 0)
+@app.post("/api/game/guesses", response_model=list[GuessResponse])
+def process_guesses(bulk_request: BulkGuessRequest):
+    """
+    Scores up to MAX_BULK_GUESSES words in one request (e.g. to restore a saved
+    history). Results are returned in request order and follow the same rules as
+    /api/game/guess, without spelling suggestions.
+    """
+    lookup = get_daily_lookup()
+    if lookup is None:
+        raise HTTPException(status_code=503, detail="Game data is not available for today. Please run daily_setup.py.")
 
-    return {"status": "found", "rank": rank, "isCorrect": is_correct}
+    ranks = [rank if rank >= 0 else None for rank in lookup.ranks_for(bulk_request.words).tolist()]
+    if redis_client is not None:
+        game = str(date.today())
+        for word, rank in zip(bulk_request.words, ranks):
+            write_buffer.add_guess(game, word, rank, bulk_request.sessionId)
+    return [guess_result(rank) for rank in ranks]
 
-@app.get("/api/leaderboard/today", response_model=list[LeaderboardEntry])
-def get_leaderboard():
-    """Retrieves the leaderboard for the current day."""
-    if not redis_client:
-        # Return empty list if no DB configured, rather than erroring out for local dev
-        return []
-    
-    leaderboard_key = f"leaderboard:{str(date.today())}"
-    # ZRANGE with scores, from rank 0 to 9 (top 10)
-    raw_leaderboard = redis_client.zrange(leaderboard_key, 0, -1, withscores=True)
-    
-    if not raw_leaderboard:
-        return []
+@app.get("/api/game/hint", response_model=HintResponse)
+def get_hint(rank: int | None = None, best: int | None = None):
+    """Hint for today's game: `?rank=50` for the word at rank 50, `?best=37` for the word at rank 36."""
+    lookup = get_daily_lookup()
+    if lookup is None:
+        raise HTTPException(status_code=503, detail="Game data is not available for today. Please run daily_setup.py.")
+    return hint_for(lookup, rank, best)
+
+@app.get("/api/game/archive/{day}", response_model=GameInfoResponse)
+def get_archived_game_info(day: date):
+    """Provides the image URL and word count for a past day's game."""
+    info = game_info(day, get_archived_lookup(day))
+    if info is None:
+        raise HTTPException(status_code=404, detail=f"No game found for {day}.")
+    return info
+
+@app.get("/api/game/archive/{day}/hint", response_model=HintResponse)
+def get_archived_hint(day: date, rank: int | None = None, best: int | None = None):
+    """Hint for a past day's game (see /api/game/hint)."""
+    return hint_for(get_archived_lookup(day), rank, best)
+
+@app.get("/api/game/image/{day}")
+def get_game_image(day: date):
+    """Serves a day's doodle straight from its pregenerated directory."""
+    if day > date.today():
+        raise HTTPException(status_code=404, detail="This game isn't available yet.")
+    game_dir = resolve_game_dir(day)
+    if game_dir is None or not (game_dir / "image.png").exists():
+        raise HTTPException(status_code=404, detail=f"No image found for {day}.")
+    return FileResponse(game_dir / "image.png", media_type="image/png")
+
+@app.get("/api/game/image/{day}/{name}")
+def get_game_image_variant(day: date, name: str, request: Request):
+    """
+    Serves a content-hashed image (the original PNG or an optimized variant). Only
+    names listed in the day's image manifest are served, with immutable caching.
+    """
+    if day > date.today():
+        raise HTTPException(status_code=404, detail="This game isn't available yet.")
+    game_dir = resolve_game_dir(day)
+    manifest = get_image_manifest(game_dir) if game_dir is not None else None
+    entries = [manifest["source"], *manifest["variants"]] if manifest is not None else []
+    entry = next((e for e in entries if e["name"] == name), None)
+    if entry is None:
+        raise HTTPException(status_code=404, detail=f"No image {name} for {day}.")
+
+    etag = f'"{entry["hash"]}"'
+    headers = {"Cache-Control": IMMUTABLE_CACHE_CONTROL, "ETag": etag}
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(game_dir / entry["file"], media_type=MEDIA_TYPES[entry["format"]], headers=headers)
+
+@app.post("/api/game/archive/{day}/guess", response_model=GuessResponse)
+def process_archived_guess(day: date, guess_request: GuessRequest):
+    """Processes a guess against a past day's game."""
+    return score_guess(get_archived_lookup(day), guess_request.word, str(day), guess_request.sessionId)
+
+@app.post("/api/practice/new", response_model=PracticeGameResponse)
+def new_practice_game(practice_request: PracticeRequest = Body(default=PracticeRequest())):
+    """
+    Starts an unlimited practice game, ranked on demand from the resident embeddings.
+    Pass a seed to replay a random game or a word to practice a specific target.
+    """
+    ranker = practice_state["ranker"]
+    if ranker is None:
+        raise HTTPException(status_code=503, detail="Practice games are not available right now.")
+
+    if practice_request.word is not None:
+        target_index = ranker.word_index.get(practice_request.word)
+        if target_index is None:
+            raise HTTPException(status_code=404, detail="Word not in our dictionary.")
+        game_id = f"t{target_index}"
+    else:
+        seed = practice_request.seed if practice_request.seed is not None else secrets.randbelow(2**31)
+        game_id = f"r{abs(seed)}"
+
+    return {"gameId": game_id, "totalWords": len(get_practice_lookup(game_id))}
+
+@app.post("/api/practice/{game_id}/guess", response_model=GuessResponse)
+def process_practice_guess(game_id: str, guess_request: GuessRequest):
+    """Processes a guess against a practice game."""
+    return score_guess(get_practice_lookup(game_id), guess_request.word, f"practice:{game_id}", guess_request.sessionId)
+
+@app.get("/api/practice/{game_id}/hint", response_model=HintResponse)
+def get_practice_hint(game_id: str, rank: int | None = None, best: int | None = None):
+    """Hint for a practice game (see /api/game/hint)."""
+    return hint_for(get_practice_lookup(game_id), rank, best)
+
+# (leaderboard key, offset, limit) -> (expires at, entries)
+_leaderboard_cache = {}
+# (leaderboard key, offset, limit) -> task reading that page from KV right now
+_leaderboard_reads = {}
 
+def leaderboard_key_for_today():
+    return f"leaderboard:{str(date.today())}"
+
+def leaderboard_member(username, session_id):
     # The member is stored as a JSON string: '{"username": "player1", "sessionId": "uuid"}'
-    leaderboard = [
+    return json.dumps({"username": username, "sessionId": session_id})
+
+def parse_leaderboard(raw_leaderboard):
+    return [
         {**json.loads(member), "score": int(score)}
         for member, score in raw_leaderboard
     ]
-    return leaderboard
+
+def cache_leaderboard(cache_key, leaderboard):
+    if len(_leaderboard_cache) > 1024: # Arbitrary offsets shouldn't grow the cache forever
+        _leaderboard_cache.clear()
+    _leaderboard_cache[cache_key] = (time.monotonic() + LEADERBOARD_CACHE_TTL, leaderboard)
+
+async def fetch_leaderboard(cache_key):
+    leaderboard_key, offset, limit = cache_key
+    try:
+        with REDIS_LATENCY.time(("zrange",)):
+            raw_leaderboard = await redis_client.zrange(leaderboard_key, offset, offset + limit - 1, withscores=True)
+        leaderboard = parse_leaderboard(raw_leaderboard)
+        cache_leaderboard(cache_key, leaderboard)
+        return leaderboard
+    finally:
+        _leaderboard_reads.pop(cache_key, None)
+
+async def read_leaderboard(leaderboard_key, offset=0, limit=LEADERBOARD_PAGE_SIZE):
+    """
+    Reads one page of a leaderboard (lowest scores first), served from a short-TTL
+    in-process cache so bursts of reads cost a single KV round trip per second.
+    Concurrent misses for the same page share one in-flight read.
+    """
+    cache_key = (leaderboard_key, offset, limit)
+    cached = _leaderboard_cache.get(cache_key)
+    if cached is not None and cached[0] > time.monotonic():
+        return cached[1]
+
+    read = _leaderboard_reads.get(cache_key)
+    if read is None:
+        read = _leaderboard_reads[cache_key] = asyncio.ensure_future(fetch_leaderboard(cache_key))
+    # Shielded so one cancelled request doesn't cancel the read for everyone waiting on it
+    return await asyncio.shield(read)
+
+def invalidate_leaderboard_cache():
+    _leaderboard_cache.clear()
+
+def merge_pending(leaderboard_key, leaderboard, limit=LEADERBOARD_PAGE_SIZE):
+    """
+    Overlays submissions still waiting in the write buffer on the top of a
+    leaderboard, so players see their score right away. Ordered like ZRANGE.
+    """
+    pending = write_buffer.pending_submissions(leaderboard_key)
+    if not pending:
+        return leaderboard
+    merged = {leaderboard_member(e["username"], e.get("sessionId")): e["score"] for e in leaderboard}
+    merged.update(pending)
+    return parse_leaderboard(sorted(merged.items(), key=lambda item: (item[1], item[0]))[:limit])
+
+@app.get("/api/leaderboard/today", response_model=list[LeaderboardEntry])
+async def get_leaderboard(
+    offset: int = Query(0, ge=0),
+    limit: int = Query(LEADERBOARD_PAGE_SIZE, ge=1, le=MAX_LEADERBOARD_PAGE_SIZE),
+):
+    """Retrieves one page of the leaderboard for the current day (top 10 by default)."""
+    if not redis_client:
+        # Return empty list if no DB configured, rather than erroring out for local dev
+        return []
+
+    leaderboard_key = leaderboard_key_for_today()
+    leaderboard = await read_leaderboard(leaderboard_key, offset, limit)
+    return merge_pending(leaderboard_key, leaderboard, limit) if offset == 0 else leaderboard
+
+@app.get("/api/leaderboard/today/player", response_model=PlayerRankResponse)
+async def get_player_rank(username: str, sessionId: str | None = None):
+    """Returns one player's score and place on today's leaderboard in a single KV round trip."""
+    if not redis_client:
+        raise HTTPException(status_code=404, detail="Player is not on today's leaderboard.")
+
+    leaderboard_key = leaderboard_key_for_today()
+    member = leaderboard_member(username, sessionId)
+    if member in write_buffer.pending_submissions(leaderboard_key):
+        # Just submitted and still buffered: write it now so KV has the player's place
+        await write_buffer.flush(redis_client)
+
+    async with redis_client.pipeline(transaction=False) as pipe:
+        pipe.zscore(leaderboard_key, member)
+        pipe.zrank(leaderboard_key, member)
+        pipe.zcard(leaderboard_key)
+        with REDIS_LATENCY.time(("pipeline",)):
+            score, rank, total = await pipe.execute()
+
+    if score is None or rank is None:
+        raise HTTPException(status_code=404, detail="Player is not on today's leaderboard.")
+
+    return {"username": username, "sessionId": sessionId, "score": int(score), "position": rank + 1, "totalPlayers": total}
+
+@lru_cache(maxsize=32)
+def _cached_archive(day, stamp):
+    return read_archive(day)
+
+def get_leaderboard_archive(day):
+    """Returns a past day's archived leaderboard, re-read only when its file changes."""
+    path = archive_path(day)
+    if not path.exists():
+        return None
+    return _cached_archive(day, path.stat().st_mtime_ns)
+
+@app.get("/api/leaderboard/history", response_model=list[date])
+def get_leaderboard_history_days():
+    """Lists the past days whose leaderboards have been archived, oldest first."""
+    return archived_days()
+
+@app.get("/api/leaderboard/history/{day}", response_model=list[LeaderboardEntry])
+def get_leaderboard_history(
+    day: date,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(LEADERBOARD_PAGE_SIZE, ge=1, le=MAX_LEADERBOARD_PAGE_SIZE),
+):
+    """One page of a past day's final leaderboard, served from its archive rather than KV."""
+    archive = get_leaderboard_archive(day)
+    if archive is None:
+        raise HTTPException(status_code=404, detail=f"No archived leaderboard for {day}.")
+    return archive_page(archive, offset, limit)
 
 @app.post("/api/leaderboard/submit", response_model=list[LeaderboardEntry])
-def submit_to_leaderboard(entry: LeaderboardEntry):
-    """Submits a new entry to the daily leaderboard."""
+async def submit_to_leaderboard(entry: LeaderboardEntry):
+    """
+    Submits a new entry to the daily leaderboard and returns the refreshed top 10.
+    The write is buffered (see write_buffer.py) and batched with other submissions;
+    the response already includes it.
+    """
     if not redis_client:
         # Mock return for local dev
         return []
 
-    leaderboard_key = f"leaderboard:{str(date.today())}"
-    
-    # Store the non-score data as a JSON string in the Redis member
-    member_data = json.dumps({"username": entry.username, "sessionId": entry.sessionId})
-    
+    leaderboard_key = leaderboard_key_for_today()
+
     # Add to sorted set: the score is the score, the member is the JSON data
-    redis_client.zadd(leaderboard_key, {member_data: entry.score})
+    write_buffer.add_submission(leaderboard_key, leaderboard_member(entry.username, entry.sessionId), entry.score)
 
-    return get_leaderboard()
+    return merge_pending(leaderboard_key, await read_leaderboard(leaderboard_key))
 
 @app.get("/healthz")
-def health_check():
-    """Health check endpoint for monitoring."""
-    return {"status": "ok"}
+def health_check(response: Response):
+    """
+    Health check endpoint for monitoring. Reports 503 until startup activation has
+    finished so load balancers only route traffic to ready instances.
+    """
+    if not startup_state["ready"]:
+        response.status_code = 503
+        return {"status": "starting"}
+    return {"status": "ok", "gameLoaded": get_daily_lookup() is not None}
+
+@app.get("/metrics")
+def get_metrics():
+    """Request, game cache and KV metrics in the Prometheus text exposition format."""
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4; charset=utf-8")
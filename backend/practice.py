@@ -0,0 +1,52 @@
+import random
+from functools import lru_cache
+
+import numpy as np
+
+from game_data import GameLookup, build_vocab, rank_dtype, vocab_positions
+from word_lists import read_words
+from ranking import rank_chunk
+
+# Rank arrays kept for popular practice targets (~50 KB each for 25k words)
+PRACTICE_CACHE_SIZE = 256
+
+class PracticeRanker:
+    """
+    Ranks any target against the whole vocabulary on demand for practice games.
+    `vectors` are the normalized float32 embeddings, decoded once from the
+    quantized store (see embed_store.QuantizedVectors.decode) and typically a
+    read-only memory map shared by all workers; one target costs a
+    matrix-vector product and an argsort (a few ms on CPU for 25k words).
+    """
+
+    def __init__(self, words, vectors, target_words=None):
+        self.words = words
+        self.vectors = vectors
+        self.vocab = build_vocab(words)
+        # Position of each word_list word in the sorted vocabulary
+        self.vocab_index = vocab_positions(self.vocab, words)
+        self.word_index = {word: i for i, word in enumerate(words)}
+
+        targets = [self.word_index[w] for w in (target_words or []) if w in self.word_index]
+        self.targets = targets or list(range(len(words)))
+        self.lookup_for_target = lru_cache(maxsize=PRACTICE_CACHE_SIZE)(self._rank_target)
+
+    def target_for_seed(self, seed):
+        """Deterministically picks a practice target for a seed."""
+        return random.Random(seed).choice(self.targets)
+
+    def _rank_target(self, target_index):
+        ranks = rank_chunk(self.vectors, [target_index])[0]
+        aligned = np.empty(len(self.vocab), dtype=rank_dtype(len(self.vocab)))
+        aligned[self.vocab_index] = ranks
+        return GameLookup(self.vocab, aligned)
+
+def load_practice_ranker(word_list_path, vectors, drawable_list_path=None):
+    words = read_words(word_list_path)
+    if len(words) != len(vectors):
+        raise ValueError(f"Word list length ({len(words)}) does not match embedding columns ({len(vectors)}).")
+
+    target_words = None
+    if drawable_list_path is not None and drawable_list_path.exists():
+        target_words = read_words(drawable_list_path)
+    return PracticeRanker(words, vectors, target_words)
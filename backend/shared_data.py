@@ -0,0 +1,129 @@
+"""
+Read-only arrays shared by every worker process on a host.
+
+Data that would otherwise be rebuilt in each worker (a day's game, the suggestion
+index, the normalized practice embeddings) is published once as plain .npy files
+under SHARED_DIR, which defaults to the /dev/shm tmpfs. Workers then memory-map
+the files read-only, so they all share the same physical pages: adding a worker
+costs almost no extra RAM, and after midnight only one worker pays for building a
+game while the others wait on a file lock and attach to its result.
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError: # Windows: no cross-process lock, concurrent builds race harmlessly
+    fcntl = None
+
+BACKEND_ROOT = Path(__file__).parent.resolve()
+_shm = Path("/dev/shm")
+# One directory per deployment, so two checkouts on a host never share data
+SHARED_DIR = Path(os.getenv("PIXELO_SHARED_DIR") or (
+    (_shm if _shm.is_dir() else Path(tempfile.gettempdir()))
+    / f"pixelo-{hashlib.sha256(str(BACKEND_ROOT).encode('utf-8')).hexdigest()[:8]}"
+))
+
+META_FILENAME = "meta.json"
+
+def fingerprint(*paths):
+    """Cheap version key for source files: changes whenever one is replaced or edited."""
+    digest = hashlib.sha256()
+    for path in paths:
+        path = Path(path)
+        stat = path.stat() if path.exists() else None
+        digest.update(f"{path.resolve()}:{stat and stat.st_size}:{stat and stat.st_mtime_ns};".encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+def _open_arrays(data_dir):
+    with open(data_dir / META_FILENAME, "r", encoding="utf-8") as f:
+        names = json.load(f)["arrays"]
+    return {name: np.load(data_dir / f"{name}.npy", mmap_mode="r") for name in names}
+
+def _publish(shared_dir, name, key, build):
+    tmp_dir = Path(tempfile.mkdtemp(prefix=f".{name}-", dir=shared_dir))
+    try:
+        arrays = build()
+        for array_name, array in arrays.items():
+            np.save(tmp_dir / f"{array_name}.npy", np.ascontiguousarray(array))
+        # meta.json is written last: its presence marks a complete publication
+        with open(tmp_dir / META_FILENAME, "w", encoding="utf-8") as f:
+            json.dump({"name": name, "key": key, "arrays": list(arrays)}, f)
+        os.rename(tmp_dir, shared_dir / f"{name}-{key}")
+    except OSError:
+        # Someone else published the same version first (only without fcntl)
+        if not (shared_dir / f"{name}-{key}" / META_FILENAME).exists():
+            raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    # Older versions go away; workers still mapping them keep their pages until they let go
+    for stale in shared_dir.glob(f"{name}-*"):
+        if stale.name != f"{name}-{key}":
+            shutil.rmtree(stale, ignore_errors=True)
+
+@contextmanager
+def _locked(shared_dir, name):
+    """Holds the cross-process lock for everything published under `name`."""
+    shared_dir.mkdir(parents=True, exist_ok=True)
+    with open(shared_dir / f"{name}.lock", "a") as lock_file:
+        if fcntl is not None:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _attach(shared_dir, name, key, build):
+    data_dir = shared_dir / f"{name}-{key}"
+    if (data_dir / META_FILENAME).exists():
+        return _open_arrays(data_dir)
+    with _locked(shared_dir, name):
+        if not (data_dir / META_FILENAME).exists():
+            _publish(shared_dir, name, key, build)
+    return _open_arrays(data_dir)
+
+def attach(name, key, build, shared_dir=None):
+    """
+    Returns the arrays published under `name` for version `key` as read-only
+    memory maps. If they haven't been published yet, the first worker to take the
+    lock calls `build()` (returning a dict of arrays) and publishes the result;
+    the others block until it's done and then attach to the same files.
+    """
+    shared_dir = Path(shared_dir or SHARED_DIR)
+    try:
+        return _attach(shared_dir, name, key, build)
+    except FileNotFoundError:
+        # Pruned by another worker between the existence check and the loads
+        return _attach(shared_dir, name, key, build)
+
+def prune(prefix, keep, shared_dir=None):
+    """
+    Removes all but the `keep` most recently published entries whose name starts
+    with `prefix`, together with their lock files. Each is removed under its lock,
+    so a worker publishing the same name never sees it vanish mid-way.
+    """
+    shared_dir = Path(shared_dir or SHARED_DIR)
+    published = sorted(
+        (p for p in shared_dir.glob(f"{prefix}*") if (p / META_FILENAME).exists()),
+        key=lambda p: (p / META_FILENAME).stat().st_mtime_ns,
+        reverse=True,
+    )
+    for stale in published[keep:]:
+        try:
+            with open(stale / META_FILENAME, "r", encoding="utf-8") as f:
+                name = json.load(f)["name"]
+        except (OSError, ValueError):
+            continue # Already removed by another worker
+        with _locked(shared_dir, name):
+            shutil.rmtree(stale, ignore_errors=True)
+            # Waiters still holding the unlinked file just publish again, which is safe
+            (shared_dir / f"{name}.lock").unlink(missing_ok=True)
@@ -0,0 +1,154 @@
+"""
+Write-behind buffer for KV writes that don't need to block a request.
+
+Leaderboard submissions and guess events are collected in memory and written by a
+background task in one pipeline per flush: every FLUSH_INTERVAL seconds, or sooner
+once MAX_PENDING writes are waiting. Submissions to the same leaderboard collapse
+into a single ZADD; guess events are appended to a capped Redis stream for later
+analysis. On shutdown the buffer is drained, so nothing accepted is lost unless
+the process is killed outright.
+"""
+import asyncio
+import threading
+from collections import deque
+
+from metrics import REDIS_LATENCY
+
+FLUSH_INTERVAL = 0.5
+MAX_PENDING = 500
+# Guess events kept while KV is unreachable; older ones are dropped beyond this
+MAX_BUFFERED_EVENTS = 100_000
+
+GUESS_STREAM_KEY = "guesses"
+# Approximate cap on the stream (XADD MAXLEN ~), about a week of busy days
+GUESS_STREAM_MAXLEN = 1_000_000
+
+class WriteBehindBuffer:
+    def __init__(self, flush_interval=FLUSH_INTERVAL, max_pending=MAX_PENDING, on_flush=None):
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        # Called after each successful flush, e.g. to drop cached leaderboard pages
+        self.on_flush = on_flush
+        # leaderboard key -> {member: score}; the latest submission for a member wins
+        self._submissions = {}
+        # Submissions being written right now; still reported as pending until done
+        self._flushing = {}
+        # Bounded: while KV is unreachable the oldest events fall off the front
+        self._events = deque(maxlen=MAX_BUFFERED_EVENTS)
+        self._pending = 0
+        self._dropped_events = 0
+        # Guess routes run in the threadpool, so adds can come from any thread
+        self._lock = threading.Lock()
+        # One flush at a time, so waiting on it means earlier writes have landed
+        self._flush_lock = asyncio.Lock()
+        self._loop = None
+        self._wake = None
+        self._stopping = False
+
+    def add_submission(self, leaderboard_key, member, score):
+        with self._lock:
+            self._submissions.setdefault(leaderboard_key, {})[member] = score
+            self._pending += 1
+        self._maybe_wake()
+
+    def add_guess(self, game, word, rank, session_id=None):
+        event = {"game": game, "word": word, "rank": "" if rank is None else rank, "session": session_id or ""}
+        with self._lock:
+            if len(self._events) == MAX_BUFFERED_EVENTS:
+                self._dropped_events += 1
+            self._events.append(event)
+            self._pending += 1
+        self._maybe_wake()
+
+    def pending_submissions(self, leaderboard_key):
+        """Submissions to a leaderboard that haven't been written yet, as {member: score}."""
+        with self._lock:
+            return {**self._flushing.get(leaderboard_key, {}), **self._submissions.get(leaderboard_key, {})}
+
+    def _maybe_wake(self):
+        if self._pending >= self.max_pending and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def _take(self):
+        with self._lock:
+            submissions, events = self._submissions, self._events
+            self._submissions, self._pending = {}, 0
+            self._events = deque(maxlen=MAX_BUFFERED_EVENTS)
+            self._flushing = submissions
+        return submissions, events
+
+    def _restore(self, submissions, events):
+        """Puts back a batch that failed to flush; newer submissions for the same member win."""
+        with self._lock:
+            self._flushing = {}
+            for key, members in submissions.items():
+                current = self._submissions.setdefault(key, {})
+                for member, score in members.items():
+                    current.setdefault(member, score)
+            # Older events go back in front; beyond the cap the oldest are dropped
+            newer = self._events
+            self._events = deque(events, maxlen=MAX_BUFFERED_EVENTS)
+            self._dropped_events += max(0, len(events) + len(newer) - MAX_BUFFERED_EVENTS)
+            self._events.extend(newer)
+            self._pending += sum(len(members) for members in submissions.values()) + len(events)
+
+    async def flush(self, client):
+        """
+        Writes everything buffered so far in a single pipeline, after any flush
+        already in progress. Returns False on failure.
+        """
+        async with self._flush_lock:
+            return await self._flush(client)
+
+    async def _flush(self, client):
+        submissions, events = self._take()
+        if not submissions and not events:
+            return True
+
+        try:
+            async with client.pipeline(transaction=False) as pipe:
+                for key, members in submissions.items():
+                    pipe.zadd(key, members)
+                for event in events:
+                    pipe.xadd(GUESS_STREAM_KEY, event, maxlen=GUESS_STREAM_MAXLEN, approximate=True)
+                with REDIS_LATENCY.time(("flush",)):
+                    await pipe.execute()
+        except Exception as e:
+            print(f"Failed to flush {len(submissions)} leaderboards and {len(events)} guess events: {e}")
+            self._restore(submissions, events)
+            return False
+
+        if self.on_flush is not None:
+            self.on_flush()
+        with self._lock:
+            self._flushing = {}
+
+        if self._dropped_events:
+            print(f"Dropped {self._dropped_events} guess events while KV was unavailable.")
+            self._dropped_events = 0
+        return True
+
+    async def run(self, client):
+        """Background task: flushes on the interval or size threshold until `stop`, then drains."""
+        self._loop = asyncio.get_running_loop()
+        self._wake = asyncio.Event()
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wake.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush(client)
+        await self.drain(client)
+
+    async def drain(self, client, attempts=3):
+        for _ in range(attempts):
+            if await self.flush(client):
+                return
+            await asyncio.sleep(self.flush_interval)
+        print(f"Giving up on {self._pending} buffered writes at shutdown.")
+
+    def stop(self):
+        self._stopping = True
+        if self._wake is not None:
+            self._wake.set()
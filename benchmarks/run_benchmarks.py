@@ -0,0 +1,353 @@
+"""
+Offline benchmark and load-test suite for Pixelo.
+
+    python benchmarks/run_benchmarks.py                    # everything, writes benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --suite api        # API load test only
+    python benchmarks/run_benchmarks.py --quick            # smallest scales only
+    python benchmarks/run_benchmarks.py --compare benchmarks/baseline.json --output /tmp/new.json
+
+The API suite drives backend/main.py in-process over ASGI against a synthetic game
+and a local Redis stand-in (fakeredis, or a real server via --redis-url), reporting
+p50/p95/p99 latency and requests per second per route. The core suite times
+ranking, JSON vs binary lookup loading and leaderboard reads at synthetic scales.
+Nothing touches the network or the real game data.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from pathlib import Path
+
+import numpy as np
+
+BASE_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
+
+from game_data import GameLookup, build_vocab, rank_dtype, save_vocab, write_game, load_game
+from ranking import normalize_embeddings, compute_rank_arrays, rank_chunk
+from embed_store import VECTOR_DTYPES, write_vectors, load_vectors
+from word_lists import read_words, write_words
+
+DEFAULT_OUTPUT = BASE_DIR / "benchmarks" / "baseline.json"
+WORD_SCALES = (25_000, 100_000, 500_000)
+PLAYER_SCALES = (1_000, 10_000, 100_000, 1_000_000)
+EMBED_DIM = 384
+
+# --- Helpers ---
+
+def summarize(samples):
+    """Latency summary in milliseconds for a list of durations in seconds."""
+    ms = np.asarray(samples) * 1000
+    return {
+        "n": len(ms),
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+    }
+
+def time_repeated(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+def synthetic_words(n_words):
+    return [f"w{i:07d}" for i in range(n_words)]
+
+def synthetic_game(n_words, rng):
+    words = synthetic_words(n_words)
+    vocab = build_vocab(words)
+    return words, GameLookup(vocab, rng.permutation(n_words).astype(rank_dtype(n_words)))
+
+def make_redis(redis_url, server=None, async_client=False):
+    """A Redis client for `redis_url`, or fakeredis (clients sharing `server` share data)."""
+    if redis_url:
+        from redis import from_url
+        from redis.asyncio import from_url as async_from_url
+        return async_from_url(redis_url) if async_client else from_url(redis_url)
+    import fakeredis
+    return fakeredis.FakeAsyncRedis(server=server) if async_client else fakeredis.FakeRedis(server=server)
+
+def populate_leaderboard(client, key, n_players, rng, chunk=50_000):
+    client.delete(key)
+    scores = rng.integers(1, 500, size=n_players)
+    for start in range(0, n_players, chunk):
+        members = {
+            json.dumps({"username": f"player{i}", "sessionId": f"s{i}"}): int(scores[i])
+            for i in range(start, min(start + chunk, n_players))
+        }
+        client.zadd(key, members)
+
+# --- Core micro-benchmarks ---
+
+def bench_ranking(n_words, rng, n_targets=8, repeat=3):
+    embeddings = rng.standard_normal((EMBED_DIM, n_words), dtype=np.float32)
+    started = time.perf_counter()
+    normalized = normalize_embeddings(embeddings)
+    normalize_s = time.perf_counter() - started
+    targets = rng.choice(n_words, size=n_targets, replace=False)
+    result = time_repeated(lambda: compute_rank_arrays(normalized, targets, workers=1), repeat)
+    result["normalize_ms"] = normalize_s * 1000
+    result["targets"] = n_targets
+    result["per_target_ms"] = result["p50_ms"] / n_targets
+    return result
+
+def bench_embedding_load(n_words, rng, tmp_dir, repeat=3):
+    """Load + normalize cost of an embedding store, as pregenerate_data.load_data pays it."""
+    path = Path(tmp_dir) / f"embed_{n_words}.npy"
+    np.save(path, rng.standard_normal((EMBED_DIM, n_words), dtype=np.float32))
+    result = time_repeated(lambda: normalize_embeddings(np.load(path)), repeat)
+    path.unlink()
+    return result
+
+def bench_vector_load(n_words, rng, tmp_dir, repeat=3):
+    """Cost of opening the quantized vector store and ranking one target with it, and its size, per storage type."""
+    store_dir = Path(tmp_dir) / f"vectors_{n_words}"
+    store_dir.mkdir()
+    words = synthetic_words(n_words)
+    write_words(words, store_dir / "word_list.txt")
+    embeddings = rng.standard_normal((EMBED_DIM, n_words), dtype=np.float32)
+    results = {}
+    for dtype in VECTOR_DTYPES:
+        vectors_path = store_dir / f"vectors_{dtype}.npy"
+        write_vectors(words, embeddings, dtype, vectors_path, version=1)
+        results[dtype] = time_repeated(lambda: rank_chunk(load_vectors(store_dir / "word_list.txt", vectors_path)[1], [0]), repeat)
+        results[dtype]["size_mb"] = vectors_path.stat().st_size / 2**20
+    return results
+
+def bench_lookup_loading(n_words, rng, tmp_dir, repeat=5):
+    words, game = synthetic_game(n_words, rng)
+    day_dir = Path(tmp_dir) / f"lookup_{n_words}" / "day"
+    day_dir.mkdir(parents=True)
+    save_vocab(day_dir.parent / "vocab.npy", game.vocab)
+    write_game(day_dir, game.ranks)
+    json_path = day_dir / "lookup.json"
+    with open(json_path, "w", encoding="utf-8") as f:
+        json.dump(dict(zip(words, game.ranks_for(words).tolist())), f)
+
+    probe = words[len(words) // 2]
+
+    def load_json():
+        with open(json_path, "r", encoding="utf-8") as f:
+            lookup = json.load(f)
+        return lookup[probe]
+
+    def load_binary():
+        return load_game(day_dir)[probe]
+
+    return {
+        "json": time_repeated(load_json, repeat),
+        "binary": time_repeated(load_binary, repeat),
+        "json_bytes": json_path.stat().st_size,
+        "binary_bytes": (day_dir / "ranks.npy").stat().st_size,
+    }
+
+def bench_leaderboard(n_players, rng, redis_url, repeat=20):
+    client = make_redis(redis_url)
+    key = f"bench:leaderboard:{n_players}"
+    populate_leaderboard(client, key, n_players, rng)
+
+    def top_k():
+        return [json.loads(m) for m, _ in client.zrange(key, 0, 9, withscores=True)]
+
+    member = json.dumps({"username": f"player{n_players // 2}", "sessionId": f"s{n_players // 2}"})
+
+    def player_rank():
+        pipe = client.pipeline(transaction=False)
+        pipe.zscore(key, member)
+        pipe.zrank(key, member)
+        pipe.zcard(key)
+        return pipe.execute()
+
+    result = {"top10": time_repeated(top_k, repeat), "player_rank": time_repeated(player_rank, repeat)}
+    # The old full-board read grows with players; keep it to sizes that finish quickly
+    if n_players <= 100_000:
+        result["full_board"] = time_repeated(lambda: [json.loads(m) for m, _ in client.zrange(key, 0, -1, withscores=True)], 3)
+    client.delete(key)
+    return result
+
+def run_core(word_scales, player_scales, redis_url, seed=0):
+    rng = np.random.default_rng(seed)
+    results = {"ranking": {}, "embedding_load": {}, "vector_load": {}, "lookup_loading": {}, "leaderboard": {}}
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for n_words in word_scales:
+            print(f"[core] {n_words} words...")
+            results["ranking"][str(n_words)] = bench_ranking(n_words, rng)
+            results["embedding_load"][str(n_words)] = bench_embedding_load(n_words, rng, tmp_dir)
+            results["vector_load"][str(n_words)] = bench_vector_load(n_words, rng, tmp_dir)
+            results["lookup_loading"][str(n_words)] = bench_lookup_loading(n_words, rng, tmp_dir)
+    for n_players in player_scales:
+        print(f"[core] {n_players} players...")
+        results["leaderboard"][str(n_players)] = bench_leaderboard(n_players, rng, redis_url)
+    return results
+
+# --- API load test ---
+
+def setup_api(tmp_dir, redis_url, n_players, rng):
+    """Points backend/main.py at a synthetic game and a local Redis stand-in."""
+    import main
+    import shared_data
+
+    words = read_words(BASE_DIR / "word_list.txt")
+    vocab = build_vocab(words)
+    game_dir = Path(tmp_dir) / "pregen" / str(date.today())
+    game_dir.mkdir(parents=True)
+    save_vocab(game_dir.parent / "vocab.npy", vocab)
+    write_game(game_dir, rng.permutation(len(vocab)).astype(rank_dtype(len(vocab))))
+    (game_dir / "image.png").write_bytes(b"\x89PNG benchmark placeholder")
+
+    shared_data.SHARED_DIR = Path(tmp_dir) / "shared"
+    main.get_vocab = lambda: None
+    main.resolve_game_dir = lambda day: game_dir
+    main.game_store.clear()
+    # Populated through a sync client; the app gets an async client per event loop
+    server = None
+    if not redis_url:
+        import fakeredis
+        server = fakeredis.FakeServer()
+    populate_leaderboard(make_redis(redis_url, server), main.leaderboard_key_for_today(), n_players, rng)
+    main.startup_state["ready"] = True
+    return main, words, server
+
+async def load_test(app, make_request, total, concurrency):
+    import httpx
+
+    samples = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        queue = iter(range(total))
+
+        async def worker():
+            for i in queue:
+                started = time.perf_counter()
+                response = await make_request(client, i)
+                samples.append(time.perf_counter() - started)
+                if response.status_code >= 500:
+                    raise RuntimeError(f"{response.status_code}: {response.text}")
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    result = summarize(samples)
+    result["rps"] = total / elapsed
+    result["concurrency"] = concurrency
+    return result
+
+def run_api(total, concurrency, redis_url, n_players=10_000, seed=0):
+    rng = np.random.default_rng(seed)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        main, words, server = setup_api(tmp_dir, redis_url, n_players, rng)
+        guesses = [words[i] for i in rng.integers(0, len(words), size=total)]
+        scenarios = {
+            "GET /api/game/today": lambda c, i: c.get("/api/game/today"),
+            "POST /api/game/guess": lambda c, i: c.post("/api/game/guess", json={"word": guesses[i]}),
+            "POST /api/game/guesses (100 words)": lambda c, i: c.post("/api/game/guesses", json={"words": guesses[:100]}),
+            "GET /api/leaderboard/today": lambda c, i: c.get("/api/leaderboard/today"),
+            "GET /api/leaderboard/today/player": lambda c, i: c.get("/api/leaderboard/today/player", params={"username": "player1", "sessionId": "s1"}),
+            "POST /api/leaderboard/submit": lambda c, i: c.post("/api/leaderboard/submit", json={"username": f"bench{i}", "score": int(i % 50) + 1, "sessionId": f"b{i}"}),
+        }
+
+        async def run_scenarios():
+            # Async clients are bound to the loop they were created on
+            main.redis_client = make_redis(redis_url, server, async_client=True)
+            # The lifespan doesn't run under ASGITransport, so start the write-behind flusher here
+            flush_task = asyncio.create_task(main.write_buffer.run(main.redis_client))
+            results = {}
+            try:
+                for name, make_request in scenarios.items():
+                    print(f"[api] {name}...")
+                    results[name] = await load_test(main.app, make_request, total, concurrency)
+            finally:
+                main.write_buffer.stop()
+                await flush_task
+                await main.redis_client.aclose()
+            return results
+
+        return asyncio.run(run_scenarios())
+
+# --- Results ---
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def flatten(results, prefix=""):
+    """Flattens nested results into {"a/b/p50_ms": value} for comparisons."""
+    flat = {}
+    for key, value in results.items():
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            flat.update(flatten(value, path + "/"))
+        elif key.endswith("_ms") or key == "rps":
+            flat[path] = value
+    return flat
+
+def load_baseline(baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        return flatten(json.load(f)["results"])
+
+def compare(current, baseline, threshold=1.25):
+    print(f"\nComparison against baseline (regression threshold {threshold:.2f}x):")
+    regressions = 0
+    for path, value in flatten(current).items():
+        if path not in baseline or not baseline[path]:
+            continue
+        # For latencies higher is worse, for throughput lower is worse
+        ratio = value / baseline[path] if not path.endswith("rps") else baseline[path] / value
+        flag = "REGRESSION" if ratio > threshold else ""
+        regressions += bool(flag)
+        print(f"  {path}: {baseline[path]:.3f} -> {value:.3f} ({ratio:.2f}x) {flag}")
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Pixelo benchmark suite offline.")
+    parser.add_argument("--suite", choices=("all", "core", "api"), default="all")
+    parser.add_argument("--quick", action="store_true", help="Only the smallest word and player scales.")
+    parser.add_argument("--requests", type=int, default=2000, help="Requests per API route.")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent in-flight API requests.")
+    parser.add_argument("--redis-url", default=None, help="Use this local Redis instead of fakeredis.")
+    parser.add_argument("--output", type=Path, default=DEFAULT_OUTPUT, help="Where to write the results JSON.")
+    parser.add_argument("--compare", type=Path, default=None, help="Baseline results JSON to compare against.")
+    args = parser.parse_args()
+
+    # Read the baseline up front in case --output overwrites it
+    baseline = load_baseline(args.compare) if args.compare is not None else None
+
+    word_scales = WORD_SCALES[:1] if args.quick else WORD_SCALES
+    player_scales = PLAYER_SCALES[:1] if args.quick else PLAYER_SCALES
+
+    results = {}
+    if args.suite in ("all", "core"):
+        results["core"] = run_core(word_scales, player_scales, args.redis_url)
+    if args.suite in ("all", "api"):
+        results["api"] = run_api(args.requests, args.concurrency, args.redis_url)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "redis": args.redis_url or "fakeredis",
+        },
+        "results": results,
+    }
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote results to {args.output}")
+
+    if baseline is not None:
+        sys.exit(1 if compare(results, baseline) else 0)
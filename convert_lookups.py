@@ -0,0 +1,72 @@
+import argparse
+import json
+import numpy as np
+from pathlib import Path
+
+from word_lists import read_words
+from game_data import (
+    VOCAB_FILENAME, RANKS_FILENAME, JSON_FILENAME,
+    GameLookup, build_vocab, save_vocab, load_vocab, write_game, open_game,
+)
+
+# Setup paths
+BASE_DIR = Path(__file__).parent.resolve()
+PREGEN_DIR = BASE_DIR / "backend" / "pregen_data"
+WORD_LIST_PATH = BASE_DIR / "word_list.txt"
+
+def load_shared_vocab(json_paths):
+    """Uses the existing vocab.npy if present, otherwise builds one from word_list.txt."""
+    vocab_path = PREGEN_DIR / VOCAB_FILENAME
+    if vocab_path.exists():
+        return load_vocab(vocab_path, mmap=False)
+
+    if WORD_LIST_PATH.exists():
+        words = read_words(WORD_LIST_PATH)
+    else:
+        # No word list checked out: take the words from the first lookup
+        with open(json_paths[0], "r", encoding="utf-8") as f:
+            words = list(json.load(f))
+
+    vocab = build_vocab(words)
+    save_vocab(vocab_path, vocab)
+    print(f"Wrote shared vocabulary ({len(vocab)} words) to {vocab_path}")
+    return vocab
+
+def convert_day(json_path, vocab, with_order=False, remove_json=False):
+    day_dir = json_path.parent
+    with open(json_path, "r", encoding="utf-8") as f:
+        lookup = json.load(f)
+
+    game = GameLookup.from_dict(lookup, vocab)
+    write_game(day_dir, game.ranks, with_order=with_order)
+
+    # Verify the round trip before touching the original
+    converted = open_game(day_dir / RANKS_FILENAME, vocab)
+    words = list(lookup)
+    if not np.array_equal(converted.ranks_for(words), list(lookup.values())):
+        raise ValueError(f"Round trip mismatch for {json_path}")
+
+    if remove_json:
+        json_path.unlink()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert pregenerated lookup.json files to the binary game format.")
+    parser.add_argument("--with-order", action="store_true", help="Also write the inverse rank -> word array (order.npy).")
+    parser.add_argument("--remove-json", action="store_true", help="Delete each lookup.json after a verified conversion.")
+    args = parser.parse_args()
+
+    json_paths = sorted(PREGEN_DIR.glob(f"*/{JSON_FILENAME}"))
+    if not json_paths:
+        print(f"No {JSON_FILENAME} files found under {PREGEN_DIR}.")
+        raise SystemExit(0)
+
+    vocab = load_shared_vocab(json_paths)
+
+    json_bytes = binary_bytes = 0
+    for json_path in json_paths:
+        json_bytes += json_path.stat().st_size
+        convert_day(json_path, vocab, with_order=args.with_order, remove_json=args.remove_json)
+        binary_bytes += sum(p.stat().st_size for p in json_path.parent.glob("*.npy"))
+        print(f"Converted {json_path.parent.name}")
+
+    print(f"Converted {len(json_paths)} days: {json_bytes / 1024:.0f} KB of JSON -> {binary_bytes / 1024:.0f} KB binary.")
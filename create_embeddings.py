@@ -1,26 +1,128 @@
+import argparse
+import json
+import os
 import numpy as np
-from wordfreq import top_n_list
-from nltk.corpus import stopwords
-from langchain_huggingface import HuggingFaceEmbeddings
+from pathlib import Path
 from tqdm import tqdm
 
-word_list = top_n_list("en", 25000)
-stop_words = set(stopwords.words("english"))
-word_list = [w for w in word_list if w not in stop_words]
+from atomic_files import atomic_write
+from word_lists import read_words, write_words
+from embed_store import BASE_DIR, WORD_LIST_PATH, EMBED_STORE_PATH, VECTORS_PATH, VECTOR_DTYPES, words_hash, write_metadata, read_metadata, check_store, write_vectors
 
-embedding_model = HuggingFaceEmbeddings(model_name="sentence-transformers/all-MiniLM-L6-v2")
+# Setup paths
+# In-progress store and its checkpoint; renamed/removed once the build completes
+PARTIAL_STORE_PATH = BASE_DIR / "embed_store.partial.npy"
+CHECKPOINT_PATH = BASE_DIR / "embed_store.progress.json"
 
-print("\nEmbedding word list...")
-embed_store = np.array([]).reshape(384, 0)
+MODEL_NAME = "sentence-transformers/all-MiniLM-L6-v2"
+EMBED_DIM = 384
 
-for word in tqdm(word_list):
-    vector = np.array(embedding_model.embed_query(word)).reshape(-1, 1)
-    embed_store = np.hstack((embed_store, vector))
+def build_word_list(vocab_size):
+    from wordfreq import top_n_list
+    from nltk.corpus import stopwords
 
-print("Embedding complete.\n")
+    word_list = top_n_list("en", vocab_size)
+    stop_words = set(stopwords.words("english"))
+    return [w for w in word_list if w not in stop_words]
 
-with open("word_list.txt", "w", encoding="utf-8") as file:
-    for word in word_list:
-        file.write(word + "\n")
+def load_model(batch_size):
+    from langchain_huggingface import HuggingFaceEmbeddings
 
-np.save("embed_store.npy", embed_store)
+    return HuggingFaceEmbeddings(
+        model_name=MODEL_NAME,
+        model_kwargs={"device": "cpu"},
+        encode_kwargs={"batch_size": batch_size},
+    )
+
+def open_store(words, existing_store=None):
+    """
+    Returns (store, done) for a build over `words`. The store is a preallocated,
+    memory-mapped (384, N) float32 array stored column-major, so each batch of
+    words lands in one contiguous block. Resumes from the checkpoint when it was
+    written for the same word list; otherwise starts fresh, copying in the columns
+    of `existing_store` (the words it already covers are never re-embedded).
+    """
+    shape = (EMBED_DIM, len(words))
+    digest = words_hash(words)
+
+    if CHECKPOINT_PATH.exists() and PARTIAL_STORE_PATH.exists():
+        with open(CHECKPOINT_PATH, "r", encoding="utf-8") as f:
+            checkpoint = json.load(f)
+        if checkpoint.get("words_hash") == digest:
+            store = np.lib.format.open_memmap(PARTIAL_STORE_PATH, mode="r+")
+            if store.shape == shape:
+                print(f"Resuming from checkpoint: {checkpoint['done']}/{len(words)} words embedded.")
+                return store, checkpoint["done"]
+        print("Checkpoint belongs to a different word list; starting over.")
+
+    store = np.lib.format.open_memmap(PARTIAL_STORE_PATH, mode="w+", dtype=np.float32, shape=shape, fortran_order=True)
+    done = 0
+    if existing_store is not None:
+        done = existing_store.shape[1]
+        store[:, :done] = existing_store
+        print(f"Reusing {done} existing embeddings.")
+    save_checkpoint(store, digest, done)
+    return store, done
+
+def save_checkpoint(store, digest, done):
+    store.flush()
+    with atomic_write(CHECKPOINT_PATH, "w", encoding="utf-8") as f:
+        json.dump({"words_hash": digest, "done": done}, f)
+
+def embed_words(words, existing_store=None, batch_size=512, vector_dtype=None):
+    store, done = open_store(words, existing_store)
+    if done < len(words):
+        model = load_model(batch_size)
+        digest = words_hash(words)
+        print(f"\nEmbedding {len(words) - done} words in batches of {batch_size}...")
+        with tqdm(total=len(words), initial=done) as progress:
+            for start in range(done, len(words), batch_size):
+                batch = words[start : start + batch_size]
+                vectors = np.asarray(model.embed_documents(batch), dtype=np.float32)
+                if vectors.shape[1] != EMBED_DIM:
+                    raise ValueError(f"Model returned {vectors.shape[1]}-d vectors, expected {EMBED_DIM}.")
+                store[:, start : start + len(batch)] = vectors.T
+                save_checkpoint(store, digest, start + len(batch))
+                progress.update(len(batch))
+    print("Embedding complete.\n")
+
+    store.flush()
+    del store
+    os.replace(PARTIAL_STORE_PATH, EMBED_STORE_PATH)
+    CHECKPOINT_PATH.unlink(missing_ok=True)
+
+    write_words(words, WORD_LIST_PATH)
+    metadata = write_metadata(words)
+    print(f"Embedding store is now version {metadata['version']} ({len(words)} words).")
+
+    # The quantized copy everything ranks with follows every change to the store
+    vectors = write_vectors(words, np.load(EMBED_STORE_PATH, mmap_mode="r"), vector_dtype, version=metadata["version"])
+    print(f"Wrote {VECTORS_PATH.name} ({vectors['dtype']}).")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build (or extend) word_list.txt and embed_store.npy.")
+    parser.add_argument("--vocab-size", type=int, default=25000, help="Number of most frequent English words to consider.")
+    parser.add_argument("--words-file", type=Path, default=None, help="Use the words in this file instead of the frequency list.")
+    parser.add_argument("--update", action="store_true", help="Keep the existing store and only embed words it does not cover yet.")
+    parser.add_argument("--batch-size", type=int, default=512, help="Words encoded per model call.")
+    parser.add_argument("--vector-dtype", choices=VECTOR_DTYPES, default=None, help="Storage type of embed_vectors.npy (default: keep the current one).")
+    args = parser.parse_args()
+
+    candidates = read_words(args.words_file) if args.words_file else build_word_list(args.vocab_size)
+
+    existing_store = None
+    if args.update and EMBED_STORE_PATH.exists() and WORD_LIST_PATH.exists():
+        existing_words = read_words(WORD_LIST_PATH)
+        existing_store = np.load(EMBED_STORE_PATH, mmap_mode="r")
+        try:
+            check_store(existing_words, existing_store, read_metadata())
+        except ValueError as e:
+            raise SystemExit(str(e))
+        known = set(existing_words)
+        new_words = [w for w in dict.fromkeys(candidates) if w not in known]
+        print(f"{len(new_words)} new words to add to the existing {len(existing_words)}.")
+        words = existing_words + new_words
+    else:
+        words = list(dict.fromkeys(candidates))
+
+    embed_words(words, existing_store, batch_size=args.batch_size, vector_dtype=args.vector_dtype)
@@ -1,72 +1,106 @@
 import json
-import shutil
 import os
 import logging
 from datetime import date
 from pathlib import Path
 from redis import from_url
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from atomic_files import atomic_write
+from leaderboard_archive import ARCHIVE_DIR, archive_leaderboards
+
+logger = logging.getLogger("daily_setup")
 
 # Paths
 BASE_DIR = Path(__file__).parent.resolve()
 BACKEND_DIR = BASE_DIR / "backend"
 PREGEN_DIR = BACKEND_DIR / "pregen_data"
-LOOKUP_DIR = BACKEND_DIR / "lookup_files"
-IMAGE_DIR = BACKEND_DIR / "static" / "images"
 STATE_FILE = BASE_DIR / "daily_state.json"
+# Points the backend at the pregenerated directory of the active game
+MANIFEST_PATH = BACKEND_DIR / "active_game.json"
+
+def read_manifest(path=MANIFEST_PATH):
+    """Returns the active game manifest ({"date": ..., "gameDir": ...}), or None if missing."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
 
-def activate_next_game():
+def write_manifest(current_date_str, game_dir_name, path=MANIFEST_PATH):
+    """Atomically replaces the manifest so readers never see a half-written file."""
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump({"date": current_date_str, "gameDir": game_dir_name}, f)
+
+def activate_next_game(target_date=None, reset_leaderboard=False):
     """
-    Activates the next pre-generated game for the current day and resets the leaderboard.
-    This lightweight script is designed to be run by an automated scheduler (e.g., GitHub Actions).
+    Activates the pre-generated game for `target_date` (default: today). Runs as a
+    script from an automated scheduler (e.g., GitHub Actions) or in-process from the
+    backend at startup. Only the scheduled script passes `reset_leaderboard`, and the
+    leaderboard is only cleared when the day is activated for the first time, so a
+    re-run (or a backend starting with a stale manifest) never wipes submitted scores.
+    Returns the directory the game was activated from, or None on failure.
     """
-    logging.info("Starting daily game activation...")
-
-    logging.info("Starting daily game activation...")
+    logger.info("Starting daily game activation...")
 
-    current_date_str = str(date.today())
-    logging.info(f"Activating game for date: {current_date_str}")
+    current_date_str = str(target_date or date.today())
+    logger.info(f"Activating game for date: {current_date_str}")
+    manifest = read_manifest()
+    first_activation = manifest is None or manifest.get("date") != current_date_str
 
     source_dir = PREGEN_DIR / current_date_str
     
     if not source_dir.exists():
-        logging.error(f"Pre-generated game directory not found for {current_date_str}. Checking for fallback...")
+        logger.error(f"Pre-generated game directory not found for {current_date_str}. Checking for fallback...")
         # Fallback to a 'default' or '1' folder if specific date is missing
         source_dir = PREGEN_DIR / "1" 
         if not source_dir.exists():
-             logging.error("Fallback game data (ID 1) also not found. Cannot activate game.")
-             return
-        logging.warning(f"Using fallback game data from {source_dir}")
+             logger.error("Fallback game data (ID 1) also not found. Cannot activate game.")
+             return None
+        logger.warning(f"Using fallback game data from {source_dir}")
 
-    os.makedirs(LOOKUP_DIR, exist_ok=True)
-    os.makedirs(IMAGE_DIR, exist_ok=True)
+    # The backend serves the game straight from pregen_data; only the manifest changes
+    write_manifest(current_date_str, source_dir.name)
+    logger.info(f"Pointed {MANIFEST_PATH.name} at {source_dir.name} for {current_date_str}.")
 
-    shutil.copy(source_dir / "lookup.json", LOOKUP_DIR / f"lookup_{current_date_str}.json")
-    shutil.copy(source_dir / "image.png", IMAGE_DIR / f"img_{current_date_str}.png")
-    logging.info(f"Copied game files for {current_date_str}.")
+    if reset_leaderboard and first_activation:
+        reset_leaderboard_for(current_date_str)
 
+    logger.info("Daily activation finished successfully.")
+    return source_dir
+
+def reset_leaderboard_for(current_date_str):
+    """Clears leftovers (e.g. from testing) in a day's leaderboard before it goes live."""
     redis_url = os.getenv('KV_URL')
-    if redis_url:
-        logging.info("Connecting to Vercel KV to reset leaderboard...")
-        try:
-            redis_client = from_url(redis_url)
-            # We don't strictly need to delete it if we want to keep history, 
-            # but for a daily reset it makes sense to ensure it's clean or just let it be.
-            # If we want to persist past leaderboards, we just don't delete.
-            # But the user said "daily game", implying new leaderboard each day.
-            # The key includes the date, so it's naturally unique per day.
-            # We only need to delete if we want to clear *today's* progress on restart.
-            # Let's keep the delete for safety in case of re-runs/testing.
-            redis_client.delete(f"leaderboard:{current_date_str}")
-            logging.info("Leaderboard for today has been reset/ensured clean in Vercel KV.")
-        except Exception as e:
-            logging.error(f"Failed to reset leaderboard: {e}")
-    else:
-        logging.warning("KV_URL environment variable not set. Skipping leaderboard reset.")
+    if not redis_url:
+        logger.warning("KV_URL environment variable not set. Skipping leaderboard reset.")
+        return
+    logger.info("Connecting to Vercel KV to reset leaderboard...")
+    try:
+        from_url(redis_url).delete(f"leaderboard:{current_date_str}")
+        logger.info("Leaderboard for today has been reset/ensured clean in Vercel KV.")
+    except Exception as e:
+        logger.error(f"Failed to reset leaderboard: {e}")
 
-    logging.info("Daily activation finished successfully.")
+def archive_finished_leaderboards(today=None):
+    """
+    Snapshots past days' leaderboards into backend/leaderboard_archive and lets their
+    KV keys expire (see leaderboard_archive.py). Runs from the scheduled workflow,
+    which commits the archives; the backend never calls this.
+    """
+    redis_url = os.getenv('KV_URL')
+    if not redis_url:
+        logger.warning("KV_URL environment variable not set. Skipping leaderboard archival.")
+        return []
+    try:
+        archived = archive_leaderboards(from_url(redis_url), today)
+    except Exception as e:
+        logger.error(f"Failed to archive leaderboards: {e}")
+        return []
+    if archived:
+        logger.info(f"Archived {len(archived)} leaderboards ({archived[0]} to {archived[-1]}) to {ARCHIVE_DIR.name}.")
+    return archived
 
 if __name__ == "__main__":
-    activate_next_game()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    activate_next_game(reset_leaderboard=True)
+    archive_finished_leaderboards()
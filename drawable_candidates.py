@@ -1,4 +1,32 @@
-import os
+"""
+Builds drawable_words.txt, the pool of daily targets.
+
+By default only the curated DRAWABLE_NOUNS that appear in word_list.txt are kept.
+With --mine, those seeds become anchors: every word in the embedding store is scored by
+its similarity to its closest anchors in one matrix product, and words above the
+threshold are added, skipping near-duplicates of words already chosen (plurals,
+synonyms) so the pool doesn't produce the same picture on nearby days.
+"""
+import argparse
+import time
+import numpy as np
+from pathlib import Path
+
+from embed_store import load_vectors
+from word_lists import read_words, write_words
+from ranking import similarities
+
+# Setup paths
+BASE_DIR = Path(__file__).parent.resolve()
+WORD_LIST_PATH = BASE_DIR / "word_list.txt"
+DRAWABLE_LIST_PATH = BASE_DIR / "drawable_words.txt"
+
+# Mining defaults (cosine similarities of all-MiniLM-L6-v2 vectors)
+MIN_ANCHOR_SIMILARITY = 0.5 # mean similarity to a word's TOP_ANCHORS closest seeds
+MAX_DUPLICATE_SIMILARITY = 0.8 # candidates closer than this to a chosen word are skipped
+TOP_ANCHORS = 3
+MAX_WORD_RANK = 15000 # only the most frequent words make recognizable targets
+DIVERSITY_BLOCK_SIZE = 1024
 
 # A curated list of concrete, drawable nouns
 DRAWABLE_NOUNS = [
@@ -24,23 +52,12 @@ DRAWABLE_NOUNS = [
     "flag", "map", "globe", "cross", "star", "heart", "circle", "square", "triangle", "arrow", "ladder", "bridge", "fence", "gate", "wheel", "tire", "engine", "battery", "magnet", "telescope", "microscope", "thermometer", "compass", "anchor", "bell", "whistle", "horn", "drum", "hammer", "saw", "drill", "screwdriver", "wrench", "nail", "screw", "bolt", "nut", "rope", "chain", "wire", "string", "thread", "needle", "pin", "clip", "button", "zipper", "pocket", "wallet", "purse", "backpack", "suitcase", "basket", "bucket", "broom", "mop", "brush", "comb", "soap", "towel", "sponge", "toothbrush", "toothpaste", "toilet", "sink", "bath", "shower", "mirror", "pillow", "blanket", "sheet", "curtain", "rug", "carpet", "mat"
 ]
 
-def main():
-    print("Generating drawable_words.txt...")
-    
-    # Load existing word list to ensure we have embeddings
-    word_list_path = "word_list.txt"
-    if not os.path.exists(word_list_path):
-        print(f"Error: {word_list_path} not found.")
-        return
-
-    with open(word_list_path, "r", encoding="utf-8") as f:
-        existing_words = set(line.strip() for line in f if line.strip())
-    
+def seed_words(existing_words):
+    """The curated nouns found in the word list, allowing simple plural/singular fixes."""
     valid_drawable_words = []
     
     for word in DRAWABLE_NOUNS:
         # Check if word exists in our embedding list
-        # We might need to check for singular/plural if exact match fails, but let's stick to exact for now
         if word in existing_words:
             valid_drawable_words.append(word)
         else:
@@ -52,14 +69,127 @@ def main():
                 valid_drawable_words.append(word[:-1])
                 
     # Remove duplicates and sort
-    valid_drawable_words = sorted(list(set(valid_drawable_words)))
+    return sorted(set(valid_drawable_words))
+
+def inflections(word):
+    """Simple plural/singular forms treated as the same target."""
+    forms = {word, word + "s", word + "es"}
+    if word.endswith("ies"):
+        forms.add(word[:-3] + "y")
+    if word.endswith("es"):
+        forms.add(word[:-2])
+    if word.endswith("s"):
+        forms.add(word[:-1])
+    return forms
+
+def noun_filter():
+    """Returns a predicate accepting nouns per WordNet, or None if the corpus isn't installed."""
+    try:
+        from nltk.corpus import wordnet
+        wordnet.ensure_loaded()
+    except (ImportError, LookupError):
+        print("WordNet not available; not filtering candidates by part of speech.")
+        return None
+    return lambda word: bool(wordnet.synsets(word, pos=wordnet.NOUN))
+
+def mine_candidates(
+    words,
+    vectors,
+    anchors,
+    min_similarity=MIN_ANCHOR_SIMILARITY,
+    max_duplicate_similarity=MAX_DUPLICATE_SIMILARITY,
+    top_anchors=TOP_ANCHORS,
+    max_rank=MAX_WORD_RANK,
+    limit=None,
+    is_noun=None,
+):
+    """
+    Returns the mined words (anchors excluded), best first. `vectors` are the
+    normalized (N, 384) embeddings aligned with `words` (see embed_store.load_vectors).
+    """
+    word_index = {word: i for i, word in enumerate(words)}
+    anchor_ids = np.array([word_index[word] for word in anchors])
+
+    # One (N, A) product scores every word against every anchor, a block of words at a time
+    scores = similarities(vectors, vectors[anchor_ids]).T
+    k = min(top_anchors, len(anchor_ids))
+    scores = np.partition(scores, -k, axis=1)[:, -k:].mean(axis=1)
+
+    eligible = scores >= min_similarity
+    eligible[max_rank:] = False
+    eligible[anchor_ids] = False
+    candidate_ids = np.flatnonzero(eligible)
+    candidate_ids = candidate_ids[np.argsort(-scores[candidate_ids], kind="stable")]
+    candidate_ids = np.array([
+        i for i in candidate_ids.tolist()
+        if words[i].isalpha() and len(words[i]) >= 3 and (is_noun is None or is_noun(words[i]))
+    ], dtype=np.int64)
+    print(f"{len(candidate_ids)} words score at least {min_similarity} against the anchors.")
+
+    # Greedy diversity pass: best candidates first, each one blocks its near-duplicates.
+    # Done in blocks so memory stays at block x chosen similarities, not candidates^2.
+    chosen_forms = set().union(*(inflections(word) for word in anchors))
+    chosen_ids = anchor_ids.tolist()
+    mined = []
+    for start in range(0, len(candidate_ids), DIVERSITY_BLOCK_SIZE):
+        block_ids = candidate_ids[start : start + DIVERSITY_BLOCK_SIZE]
+        block_vectors = vectors[block_ids]
+        blocked = (block_vectors @ vectors[chosen_ids].T).max(axis=1) > max_duplicate_similarity
+        gram = block_vectors @ block_vectors.T
+        for position, i in enumerate(block_ids.tolist()):
+            if blocked[position] or words[i] in chosen_forms:
+                continue
+            mined.append(words[i])
+            chosen_ids.append(i)
+            chosen_forms |= inflections(words[i])
+            if limit is not None and len(mined) >= limit:
+                return mined
+            blocked |= gram[position] > max_duplicate_similarity
+    return mined
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate drawable_words.txt, optionally mining the embedding store for more targets.")
+    parser.add_argument("--mine", action="store_true", help="Add words similar to the curated seeds from the embedding store.")
+    parser.add_argument("--min-similarity", type=float, default=MIN_ANCHOR_SIMILARITY, help="Minimum mean similarity to the closest seeds.")
+    parser.add_argument("--max-duplicate-similarity", type=float, default=MAX_DUPLICATE_SIMILARITY, help="Skip words at least this similar to an already chosen word.")
+    parser.add_argument("--top-anchors", type=int, default=TOP_ANCHORS, help="Number of closest seeds averaged into a word's score.")
+    parser.add_argument("--max-rank", type=int, default=MAX_WORD_RANK, help="Only consider the N most frequent words.")
+    parser.add_argument("--limit", type=int, default=None, help="Add at most this many mined words.")
+    args = parser.parse_args()
+
+    print("Generating drawable_words.txt...")
     
-    output_path = "drawable_words.txt"
-    with open(output_path, "w", encoding="utf-8") as f:
-        for word in valid_drawable_words:
-            f.write(word + "\n")
+    # Load existing word list to ensure we have embeddings
+    if not WORD_LIST_PATH.exists():
+        print(f"Error: {WORD_LIST_PATH} not found.")
+        return
+
+    words = read_words(WORD_LIST_PATH)
+    valid_drawable_words = seed_words(set(words))
+
+    if args.mine:
+        started = time.perf_counter()
+        try:
+            _, vectors = load_vectors(WORD_LIST_PATH)
+        except ValueError as e:
+            raise SystemExit(str(e))
+        mined = mine_candidates(
+            words,
+            vectors,
+            valid_drawable_words,
+            min_similarity=args.min_similarity,
+            max_duplicate_similarity=args.max_duplicate_similarity,
+            top_anchors=args.top_anchors,
+            max_rank=args.max_rank,
+            limit=args.limit,
+            is_noun=noun_filter(),
+        )
+        print(f"Mined {len(mined)} new words in {time.perf_counter() - started:.2f}s.")
+        valid_drawable_words = sorted(set(valid_drawable_words) | set(mined))
+
+    write_words(valid_drawable_words, DRAWABLE_LIST_PATH)
             
-    print(f"Successfully wrote {len(valid_drawable_words)} drawable words to {output_path}.")
+    print(f"Successfully wrote {len(valid_drawable_words)} drawable words to {DRAWABLE_LIST_PATH.name}.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,265 @@
+"""
+The word list and embedding store, with version metadata.
+
+word_list.txt and embed_store.npy are only meaningful together: column i of the
+store embeds line i of the list. embed_store.json records which list the store
+was built for (a hash of the words), its size and a version number that goes up
+whenever the vocabulary changes, so a mismatch is reported instead of silently
+pairing words with the wrong vectors.
+
+Everything that ranks words reads the vector store instead: the same embeddings
+pre-normalized, row-major (N, 384) and quantized to float16, or to int8 with one
+scale per row (embed_vectors.scales.npy). It is 2-4x smaller than the float32
+store and is memory-mapped as is, with no transpose or normalization at load
+time. One-off ranking decodes one block of rows at a time to float32 (numpy has
+no fast float16 or int8 matmul); callers that rank over and over (the practice
+ranker, the solver bots) decode the whole store once instead. embed_vectors.json
+ties it to the word list the same way. create_embeddings.py keeps it up to date;
+`python embed_store.py` converts an existing store and reports how closely ranks
+computed from it agree with full float64 precision.
+"""
+import argparse
+import hashlib
+import json
+import numpy as np
+from pathlib import Path
+
+from atomic_files import atomic_path, atomic_write
+from ranking import normalize_embeddings, rank_chunk
+from word_lists import read_words
+
+# Setup paths
+BASE_DIR = Path(__file__).parent.resolve()
+WORD_LIST_PATH = BASE_DIR / "word_list.txt"
+EMBED_STORE_PATH = BASE_DIR / "embed_store.npy"
+METADATA_PATH = BASE_DIR / "embed_store.json"
+VECTORS_PATH = BASE_DIR / "embed_vectors.npy"
+
+VECTOR_DTYPES = ("float16", "int8")
+DEFAULT_VECTOR_DTYPE = "float16"
+# Words quantized per block, so converting never holds a second full copy in float32
+QUANTIZE_BLOCK_SIZE = 65536
+# Rank agreement is measured over each target's top AGREEMENT_TOP_K words
+AGREEMENT_TOP_K = 1000
+AGREEMENT_TARGETS = 64
+
+def words_hash(words):
+    return hashlib.sha256("\n".join(words).encode("utf-8")).hexdigest()
+
+def read_metadata(path=METADATA_PATH):
+    """Returns the store's metadata, or None for stores built before it existed."""
+    if not Path(path).exists():
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+def write_metadata(words, version=None, path=METADATA_PATH, **extra):
+    """Records the word list a store was built for. `version` defaults to the previous one + 1."""
+    if version is None:
+        previous = read_metadata(path)
+        version = previous["version"] + 1 if previous is not None else 1
+    metadata = {"version": version, "count": len(words), "words_hash": words_hash(words), **extra}
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+    return metadata
+
+def check_store(words, embeddings, metadata=None):
+    """Raises ValueError unless the store has exactly one column per word (and matches its metadata)."""
+    if len(words) != embeddings.shape[1]:
+        raise ValueError(
+            f"Word list length ({len(words)}) does not match embedding columns ({embeddings.shape[1]}); "
+            "run update_vocab.py or create_embeddings.py --update."
+        )
+    if metadata is not None and metadata["words_hash"] != words_hash(words):
+        raise ValueError(f"{WORD_LIST_PATH.name} has changed since the embedding store (version {metadata['version']}) was built.")
+
+def load_store(word_list_path=WORD_LIST_PATH, store_path=EMBED_STORE_PATH, metadata_path=METADATA_PATH, mmap=True):
+    """Returns (words, embeddings) after checking that they belong together."""
+    words = read_words(word_list_path)
+    embeddings = np.load(store_path, mmap_mode="r" if mmap else None)
+    check_store(words, embeddings, read_metadata(metadata_path))
+    return words, embeddings
+
+# --- Quantized vector store ---
+
+def vectors_metadata_path(vectors_path=VECTORS_PATH):
+    return Path(vectors_path).with_suffix(".json")
+
+def vectors_scales_path(vectors_path=VECTORS_PATH):
+    return Path(vectors_path).with_suffix(".scales.npy")
+
+def quantize(normalized, dtype):
+    """Returns (codes, scales) for unit rows; scales is None for float16."""
+    if dtype == "float16":
+        return normalized.astype(np.float16), None
+    # Rows use the full int8 range, and the scale restores unit length on decode
+    peaks = np.abs(normalized).max(axis=1, keepdims=True)
+    peaks[peaks == 0] = 1
+    codes = np.rint(normalized * (127 / peaks)).astype(np.int8)
+    norms = np.linalg.norm(codes.astype(np.float32), axis=1)
+    scales = np.divide(1, norms, out=np.zeros_like(norms), where=norms > 0)
+    return codes, scales
+
+def dequantize(codes, scales=None):
+    """Decodes stored rows (or a single row) into float32 ready for ranking."""
+    vectors = np.asarray(codes, dtype=np.float32)
+    if scales is not None:
+        vectors *= np.asarray(scales, dtype=np.float32)[..., None]
+    return vectors
+
+class QuantizedVectors:
+    """
+    The normalized (N, 384) rows as stored: codes (float16, int8, or float32 when
+    falling back to embed_store.npy) plus the int8 scales. Indexing decodes just
+    the selected rows to float32, so ranking.similarities scores the whole store a
+    block at a time and a full float32 copy never exists. The arrays are usually
+    memory maps, shared by every process that opens them.
+    """
+
+    def __init__(self, codes, scales=None):
+        self.codes = codes
+        self.scales = scales
+
+    def __len__(self):
+        return len(self.codes)
+
+    @property
+    def shape(self):
+        return self.codes.shape
+
+    def __getitem__(self, index):
+        return dequantize(self.codes[index], None if self.scales is None else self.scales[index])
+
+    def decode(self):
+        """
+        Every row as one float32 matrix (4 bytes per dimension per word). Decoding
+        block by block costs more than the matmul itself, so callers that score
+        many targets against the store keep this copy instead.
+        """
+        return self[:]
+
+    def __array__(self, dtype=None, copy=None):
+        vectors = self.decode()
+        return vectors if dtype is None else vectors.astype(dtype, copy=False)
+
+    def arrays(self):
+        """The stored arrays, e.g. for backend/shared_data.py; see `from_arrays`."""
+        if self.scales is None:
+            return {"codes": self.codes}
+        return {"codes": self.codes, "scales": self.scales}
+
+    @classmethod
+    def from_arrays(cls, arrays):
+        return cls(arrays["codes"], arrays.get("scales"))
+
+def write_vectors(words, embeddings, dtype=None, vectors_path=VECTORS_PATH, version=None):
+    """
+    Writes the quantized, normalized store for a (384, N) embedding store. `dtype`
+    defaults to the one the existing vector store uses, and `version` to the
+    embedding store's. Returns the vector store's metadata.
+    """
+    vectors_path = Path(vectors_path)
+    if dtype is None:
+        previous = read_metadata(vectors_metadata_path(vectors_path))
+        dtype = previous["dtype"] if previous is not None else DEFAULT_VECTOR_DTYPE
+    if dtype not in VECTOR_DTYPES:
+        raise ValueError(f"Unsupported vector dtype {dtype!r}; expected one of {', '.join(VECTOR_DTYPES)}.")
+    if version is None and (store_metadata := read_metadata()) is not None:
+        version = store_metadata["version"]
+
+    n_words = embeddings.shape[1]
+    scales = np.empty(n_words, dtype=np.float32) if dtype == "int8" else None
+    with atomic_path(vectors_path) as tmp_path:
+        codes = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=dtype, shape=(n_words, embeddings.shape[0]))
+        for start in range(0, n_words, QUANTIZE_BLOCK_SIZE):
+            stop = min(start + QUANTIZE_BLOCK_SIZE, n_words)
+            block_codes, block_scales = quantize(normalize_embeddings(embeddings[:, start:stop]), dtype)
+            codes[start:stop] = block_codes
+            if scales is not None:
+                scales[start:stop] = block_scales
+        codes.flush()
+        del codes
+
+        scales_path = vectors_scales_path(vectors_path)
+        if scales is not None:
+            with atomic_write(scales_path, "wb") as f:
+                np.save(f, scales)
+        else:
+            scales_path.unlink(missing_ok=True)
+    return write_metadata(words, version, vectors_metadata_path(vectors_path), dtype=dtype, dim=embeddings.shape[0])
+
+def open_vectors(vectors_path=VECTORS_PATH, mmap=True):
+    """Returns (codes, scales, metadata) of the vector store without decoding; scales is None for float16."""
+    mode = "r" if mmap else None
+    metadata = read_metadata(vectors_metadata_path(vectors_path))
+    codes = np.load(vectors_path, mmap_mode=mode)
+    scales = np.load(vectors_scales_path(vectors_path), mmap_mode=mode) if metadata["dtype"] == "int8" else None
+    return codes, scales, metadata
+
+def load_vectors(word_list_path=WORD_LIST_PATH, vectors_path=VECTORS_PATH, store_path=EMBED_STORE_PATH):
+    """
+    Returns (words, vectors) with vectors a QuantizedVectors over the memory-mapped
+    vector store, which ranking decodes block by block. Falls back to normalizing
+    embed_store.npy (in float32) when there is no vector store. Raises ValueError
+    on a mismatch.
+    """
+    if not vectors_metadata_path(vectors_path).exists():
+        print(f"No {Path(vectors_path).name} found; normalizing {Path(store_path).name} instead (run embed_store.py to convert it).")
+        words, embeddings = load_store(word_list_path, store_path)
+        return words, QuantizedVectors(normalize_embeddings(embeddings))
+
+    words = read_words(word_list_path)
+    codes, scales, metadata = open_vectors(vectors_path)
+    if len(words) != codes.shape[0]:
+        raise ValueError(f"Word list length ({len(words)}) does not match vector rows ({codes.shape[0]}); run embed_store.py.")
+    if metadata["words_hash"] != words_hash(words):
+        raise ValueError(f"{Path(word_list_path).name} has changed since {Path(vectors_path).name} (version {metadata['version']}) was built.")
+    return words, QuantizedVectors(codes, scales)
+
+def reference_vectors(embeddings):
+    """Full-precision (float64) normalized rows, the baseline quantized ranks are checked against."""
+    vectors = np.asarray(embeddings, dtype=np.float64).T
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return vectors / norms
+
+def rank_agreement(reference, vectors, targets, top_k=AGREEMENT_TOP_K):
+    """
+    Compares the ranks two normalized matrices produce over each target's top_k
+    words (by reference rank): the share of those words whose rank is unchanged,
+    the share still within the top_k, and the largest rank shift.
+    """
+    exact, overlap, max_shift = [], [], 0
+    for target in targets:
+        expected = rank_chunk(reference, [target])[0]
+        actual = rank_chunk(vectors, [target])[0]
+        top = expected < top_k
+        exact.append(np.mean(actual[top] == expected[top]))
+        overlap.append(np.mean(actual[top] < top_k))
+        max_shift = max(max_shift, int(np.abs(actual[top].astype(np.int64) - expected[top]).max()))
+    return {"exact": float(np.mean(exact)), "top_k_overlap": float(np.mean(overlap)), "max_shift": max_shift}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert embed_store.npy into the quantized vector store and check its rank agreement.")
+    parser.add_argument("--dtype", choices=VECTOR_DTYPES, default=None, help=f"Storage type (default: keep the current one, else {DEFAULT_VECTOR_DTYPE}).")
+    parser.add_argument("--verify", action="store_true", help="Compare ranks against float64 for a sample of targets.")
+    parser.add_argument("--targets", type=int, default=AGREEMENT_TARGETS, help="Targets sampled by --verify.")
+    parser.add_argument("--top-k", type=int, default=AGREEMENT_TOP_K, help="Rank positions compared by --verify.")
+    args = parser.parse_args()
+
+    try:
+        words, embeddings = load_store()
+    except ValueError as e:
+        raise SystemExit(str(e))
+    metadata = write_vectors(words, embeddings, args.dtype)
+    size = VECTORS_PATH.stat().st_size / 2**20
+    print(f"Wrote {VECTORS_PATH.name}: {len(words)} x {metadata['dim']} {metadata['dtype']} ({size:.1f} MB), version {metadata['version']}.")
+
+    if args.verify:
+        targets = np.random.default_rng(0).choice(len(words), size=min(args.targets, len(words)), replace=False)
+        reference = reference_vectors(embeddings)
+        candidates = {"float32": normalize_embeddings(embeddings), metadata["dtype"]: load_vectors()[1]}
+        print(f"Rank agreement with float64 over the top {args.top_k} words of {len(targets)} targets:")
+        for name, vectors in candidates.items():
+            agreement = rank_agreement(reference, vectors, targets, args.top_k)
+            print(f"  {name:<8} exact {agreement['exact']:.2%}, still in top {args.top_k} {agreement['top_k_overlap']:.2%}, max shift {agreement['max_shift']}")
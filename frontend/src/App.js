@@ -5,6 +5,7 @@ const API_BASE_URL = process.env.REACT_APP_API_BASE_URL || 'http://127.0.0.1:800
 
 function App() {
     const [imageUrl, setImageUrl] = useState('');
+    const [imageSources, setImageSources] = useState([]);
     const [guess, setGuess] = useState('');
     const [history, setHistory] = useState([]);
     const [message, setMessage] = useState({ text: '', type: 'info' });
@@ -16,6 +17,8 @@ function App() {
     const [showUsernameModal, setShowUsernameModal] = useState(false);
     const [username, setUsername] = useState('');
     const [finalRank, setFinalRank] = useState(null);
+    // One id per game, sent with every guess and the score so the backend can group them
+    const [sessionId] = useState(() => crypto.randomUUID());
     const [lastGameSessionId, setLastGameSessionId] = useState(null);
     const [copyButtonText, setCopyButtonText] = useState('Share');
     const [loading, setLoading] = useState(true);
@@ -55,6 +58,11 @@ function App() {
                 }
                 const gameData = await gameResponse.json();
                 setImageUrl(`${API_BASE_URL}${gameData.imageUrl}`);
+                // Optimized AVIF/WebP variants; srcset URLs are relative to the API
+                setImageSources((gameData.sources || []).map(source => ({
+                    type: source.type,
+                    srcSet: source.srcset.split(', ').map(candidate => `${API_BASE_URL}${candidate}`).join(', '),
+                })));
                 setTotalWords(gameData.totalWords);
 
                 // Check if already played today
@@ -121,7 +129,7 @@ function App() {
             const response = await fetch(`${API_BASE_URL}/api/game/guess`, {
                 method: 'POST',
                 headers: { 'Content-Type': 'application/json' },
-                body: JSON.stringify({ word: wordToGuess }),
+                body: JSON.stringify({ word: wordToGuess, sessionId }),
             });
 
             const result = await response.json();
@@ -131,7 +139,8 @@ function App() {
             }
 
             if (result.status === 'not_in_list') {
-                setMessage({ text: result.message, type: 'error' });
+                const didYouMean = result.suggestions && result.suggestions.length ? ` Did you mean ${result.suggestions.join(', ')}?` : '';
+                setMessage({ text: `${result.message}${didYouMean}`, type: 'error' });
             } else if (result.status === 'found') {
                 const newGuessCount = guessCount + 1;
                 setGuessCount(newGuessCount);
@@ -144,8 +153,7 @@ function App() {
                 setMessage({ text: '', type: 'info' });
 
                 if (result.isCorrect) {
-                    const newSessionId = crypto.randomUUID();
-                    setLastGameSessionId(newSessionId);
+                    setLastGameSessionId(sessionId);
 
                     // Calculate potential rank based on the current leaderboard
                     const potentialRank = leaderboard.filter(e => e.score <= newGuessCount).length + 1;
@@ -290,7 +298,14 @@ function App() {
                             ) : (
                                 <>
                                     <div className="image-container">
-                                        {imageUrl ? <img id="doodle-image" src={imageUrl} alt="A.I. generated doodle" /> : <p>Loading image...</p>}
+                                        {imageUrl ? (
+                                            <picture>
+                                                {imageSources.map(source => (
+                                                    <source key={source.type} type={source.type} srcSet={source.srcSet} sizes="(max-width: 600px) 90vw, 512px" />
+                                                ))}
+                                                <img id="doodle-image" src={imageUrl} alt="A.I. generated doodle" />
+                                            </picture>
+                                        ) : <p>Loading image...</p>}
                                     </div>
                                     <div className="game-interface">
                                         {gameWon ? (
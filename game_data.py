@@ -0,0 +1,206 @@
+"""
+Compact binary storage for daily games.
+
+A game is stored as one shared vocabulary plus a small rank array per day:
+
+    vocab.npy   sorted, unique UTF-8 words (fixed-width bytes), shared by every day
+    ranks.npy   ranks[i] is the rank of vocab[i] for that day (uint16)
+    order.npy   optional inverse, order[r] is the vocab index of the word at rank r
+
+All files are plain .npy so they can be memory-mapped: every worker shares the same
+page cache instead of parsing a JSON dict into its own heap. Words are resolved by
+binary search over the sorted vocabulary, which also works for many words at once.
+"""
+import json
+import numpy as np
+from pathlib import Path
+
+from atomic_files import atomic_write
+
+VOCAB_FILENAME = "vocab.npy"
+RANKS_FILENAME = "ranks.npy"
+ORDER_FILENAME = "order.npy"
+JSON_FILENAME = "lookup.json"
+
+def rank_dtype(n_words):
+    """Smallest unsigned dtype that can hold ranks 0..n_words-1."""
+    return np.uint16 if n_words <= np.iinfo(np.uint16).max + 1 else np.uint32
+
+def build_vocab(words):
+    """Builds the sorted, fixed-width byte vocabulary for a list of unique words."""
+    encoded = [word.encode("utf-8") for word in words]
+    vocab = np.unique(np.array(encoded, dtype=np.bytes_))
+    if len(vocab) != len(encoded):
+        raise ValueError(f"Vocabulary contains duplicates ({len(encoded)} words, {len(vocab)} unique).")
+    return vocab
+
+def vocab_positions(vocab, words):
+    """
+    Vectorized word -> vocab index lookup. Returns an int array with -1 for words
+    that are not in the vocabulary.
+    """
+    encoded = [word.encode("utf-8") for word in words]
+    positions = np.full(len(encoded), -1, dtype=np.int64)
+    if not encoded or len(vocab) == 0:
+        return positions
+
+    # Words longer than the vocab's fixed width would be silently truncated by numpy
+    # and could then collide with a real word, so they are never looked up.
+    width = vocab.dtype.itemsize
+    fits = np.array([len(word) <= width for word in encoded])
+    queries = np.array(encoded, dtype=vocab.dtype)
+
+    candidates = np.searchsorted(vocab, queries)
+    candidates[candidates == len(vocab)] = 0
+    found = fits & (vocab[candidates] == queries)
+    positions[found] = candidates[found]
+    return positions
+
+class GameLookup:
+    """
+    Read-only `word -> rank` mapping for one day, backed by (usually memory-mapped)
+    numpy arrays. Supports the dict operations the API relies on (`in`, `[]`, `len`)
+    plus `ranks_for` to resolve many words in one vectorized call and `word_at` for
+    the reverse direction.
+    """
+
+    def __init__(self, vocab, ranks, order=None):
+        if len(vocab) != len(ranks):
+            raise ValueError(f"Rank array length ({len(ranks)}) does not match vocabulary size ({len(vocab)}).")
+        self.vocab = vocab
+        self.ranks = ranks
+        self.order = order
+
+    @classmethod
+    def from_dict(cls, lookup, vocab=None):
+        """Builds a lookup from a legacy `word -> rank` dict (e.g. a parsed lookup.json)."""
+        if vocab is None:
+            vocab = build_vocab(lookup)
+        positions = vocab_positions(vocab, list(lookup))
+        if len(lookup) != len(vocab) or (positions < 0).any():
+            raise ValueError("Lookup words do not match the vocabulary.")
+        ranks = np.empty(len(vocab), dtype=rank_dtype(len(vocab)))
+        ranks[positions] = list(lookup.values())
+        return cls(vocab, ranks)
+
+    def __len__(self):
+        return len(self.vocab)
+
+    def __contains__(self, word):
+        return self.ranks_for([word])[0] >= 0
+
+    def __getitem__(self, word):
+        rank = self.ranks_for([word])[0]
+        if rank < 0:
+            raise KeyError(word)
+        return int(rank)
+
+    def get(self, word, default=None):
+        rank = self.ranks_for([word])[0]
+        return default if rank < 0 else int(rank)
+
+    def ensure_order(self):
+        """Builds the inverse `rank -> vocab index` array if it wasn't stored on disk."""
+        if self.order is None:
+            self.order = inverse_ranks(self.ranks)
+        return self.order
+
+    def word_at(self, rank):
+        """Returns the word at `rank` in O(1) using the inverse index."""
+        return self.vocab[self.ensure_order()[rank]].decode("utf-8")
+
+    def ranks_for(self, words):
+        """Returns the rank of every word in `words` as an int64 array, -1 if unknown."""
+        positions = vocab_positions(self.vocab, words)
+        ranks = np.full(len(positions), -1, dtype=np.int64)
+        found = positions >= 0
+        ranks[found] = self.ranks[positions[found]]
+        return ranks
+
+def validate_game(game):
+    """
+    Checks that a loaded game is playable: its ranks must be a permutation of
+    0..N-1, so there is exactly one target and every word has a distinct rank.
+    Raises ValueError otherwise.
+    """
+    n_words = len(game.vocab)
+    counts = np.bincount(np.asarray(game.ranks, dtype=np.int64), minlength=n_words)
+    if len(counts) != n_words or (counts != 1).any():
+        raise ValueError("Game ranks are not a permutation of the vocabulary.")
+
+# --- Reading & writing ---
+
+def save_vocab(path, vocab):
+    """
+    Writes the shared vocabulary. Refuses to replace an existing, different
+    vocabulary since every stored rank array is aligned to it.
+    """
+    path = Path(path)
+    if path.exists():
+        existing = load_vocab(path)
+        if not np.array_equal(existing, vocab):
+            raise ValueError(f"{path} already holds a different vocabulary; existing games would no longer line up.")
+        return
+    np.save(path, vocab)
+
+def load_vocab(path, mmap=True):
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+def align_ranks(ranks, words, vocab):
+    """
+    Reorders a rank array indexed like `words` (e.g. word_list.txt order) into
+    vocab order, narrowed to the on-disk dtype.
+    """
+    positions = vocab_positions(vocab, words)
+    if len(words) != len(vocab) or (positions < 0).any():
+        raise ValueError("Word list does not match the vocabulary.")
+    aligned = np.empty(len(vocab), dtype=rank_dtype(len(vocab)))
+    aligned[positions] = ranks
+    return aligned
+
+def inverse_ranks(ranks):
+    """Builds the `rank -> vocab index` array for a rank array."""
+    order = np.empty(len(ranks), dtype=rank_dtype(len(ranks)))
+    order[np.asarray(ranks, dtype=np.int64)] = np.arange(len(ranks))
+    return order
+
+def _save_atomic(path, array):
+    # Written under a temporary name first so readers never see a partial file
+    with atomic_write(path, "wb") as f:
+        np.save(f, array)
+
+def write_game(day_dir, ranks, with_order=False):
+    """Writes a day's vocab-aligned rank array (and optionally its inverse)."""
+    day_dir = Path(day_dir)
+    day_dir.mkdir(parents=True, exist_ok=True)
+    if with_order:
+        _save_atomic(day_dir / ORDER_FILENAME, inverse_ranks(ranks))
+    _save_atomic(day_dir / RANKS_FILENAME, ranks)
+
+def open_game(ranks_path, vocab, order_path=None):
+    """Memory-maps a binary game. `vocab` is an already loaded vocabulary array."""
+    ranks = np.load(ranks_path, mmap_mode="r")
+    order = None
+    if order_path is not None and Path(order_path).exists():
+        order = np.load(order_path, mmap_mode="r")
+    return GameLookup(vocab, ranks, order)
+
+def load_json_game(json_path, vocab=None):
+    """Loads a legacy lookup.json into the same in-memory representation."""
+    with open(json_path, "r", encoding="utf-8") as f:
+        return GameLookup.from_dict(json.load(f), vocab)
+
+def load_game(day_dir, vocab=None):
+    """
+    Loads the game stored in a pregenerated day directory, preferring the binary
+    format and falling back to lookup.json. Returns None if neither exists.
+    `vocab` defaults to the shared vocab.npy next to the day directories.
+    """
+    day_dir = Path(day_dir)
+    if (day_dir / RANKS_FILENAME).exists():
+        if vocab is None:
+            vocab = load_vocab(day_dir.parent / VOCAB_FILENAME)
+        return open_game(day_dir / RANKS_FILENAME, vocab, day_dir / ORDER_FILENAME)
+    if (day_dir / JSON_FILENAME).exists():
+        return load_json_game(day_dir / JSON_FILENAME)
+    return None
@@ -0,0 +1,121 @@
+"""
+Web-optimized variants of each day's doodle.
+
+For every pregenerated day this writes resized WebP/AVIF copies of image.png whose
+file names carry a hash of their content, plus an images.json manifest listing them.
+Because a name changes whenever the bytes change, the backend can serve them with
+`Cache-Control: immutable`. Pillow is only needed to build variants, not to read
+the manifest. pregenerate_data.py builds them for every day it renders; the
+variants are committed with the days, so the backend and the daily workflow
+never need Pillow. `python image_variants.py` (re)builds any that are missing.
+"""
+import argparse
+import hashlib
+import io
+import json
+from pathlib import Path
+
+from atomic_files import atomic_write
+
+# Setup paths
+BASE_DIR = Path(__file__).parent.resolve()
+PREGEN_DIR = BASE_DIR / "backend" / "pregen_data"
+
+SOURCE_FILENAME = "image.png"
+IMAGE_MANIFEST_FILENAME = "images.json"
+
+VARIANT_WIDTHS = (256, 384, 512)
+# Preferred formats first; AVIF is skipped if this Pillow build can't encode it
+VARIANT_FORMATS = {
+    "avif": {"format": "AVIF", "media_type": "image/avif", "options": {"quality": 55}},
+    "webp": {"format": "WEBP", "media_type": "image/webp", "options": {"quality": 80, "method": 6}},
+}
+MEDIA_TYPES = {"png": "image/png", **{ext: spec["media_type"] for ext, spec in VARIANT_FORMATS.items()}}
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:16]
+
+def source_entry(day_dir, width=None):
+    """Manifest entry for the original PNG: served under a hashed name, stored as image.png."""
+    data = (Path(day_dir) / SOURCE_FILENAME).read_bytes()
+    digest = content_hash(data)
+    return {"file": SOURCE_FILENAME, "name": f"image.{digest}.png", "hash": digest, "format": "png", "width": width}
+
+def supported_formats():
+    from PIL import features
+
+    return [ext for ext in VARIANT_FORMATS if features.check(ext)]
+
+def build_variants(day_dir, widths=VARIANT_WIDTHS):
+    """
+    Writes the resized variants for one day and its images.json manifest, removing
+    variants left over from a previous image. Returns the manifest.
+    """
+    from PIL import Image
+
+    day_dir = Path(day_dir)
+    with Image.open(day_dir / SOURCE_FILENAME) as image:
+        image.load()
+    source = source_entry(day_dir, image.width)
+
+    variants = []
+    for ext in supported_formats():
+        spec = VARIANT_FORMATS[ext]
+        for width in sorted(set(min(w, image.width) for w in widths)):
+            height = round(image.height * width / image.width)
+            resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+            buffer = io.BytesIO()
+            resized.save(buffer, spec["format"], **spec["options"])
+            data = buffer.getvalue()
+
+            digest = content_hash(data)
+            name = f"image.{width}.{digest}.{ext}"
+            if not (day_dir / name).exists():
+                (day_dir / name).write_bytes(data)
+            variants.append({"file": name, "name": name, "hash": digest, "format": ext, "width": width})
+
+    manifest = {"source": source, "variants": variants}
+    current = {entry["file"] for entry in variants}
+    for stale in day_dir.glob("image.*.*"):
+        if stale.name not in current:
+            stale.unlink()
+
+    with atomic_write(day_dir / IMAGE_MANIFEST_FILENAME, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    return manifest
+
+def load_image_manifest(day_dir):
+    """
+    Reads a day's images.json. Days without one (e.g. built without Pillow) still
+    get a content-hashed entry for the original PNG. Returns None if there's no image.
+    """
+    day_dir = Path(day_dir)
+    manifest_path = day_dir / IMAGE_MANIFEST_FILENAME
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    if (day_dir / SOURCE_FILENAME).exists():
+        return {"source": source_entry(day_dir), "variants": []}
+    return None
+
+def is_current(day_dir):
+    """True if images.json exists and still matches image.png."""
+    day_dir = Path(day_dir)
+    manifest_path = day_dir / IMAGE_MANIFEST_FILENAME
+    if not manifest_path.exists():
+        return False
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+    return manifest["source"]["hash"] == source_entry(day_dir)["hash"]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build optimized WebP/AVIF variants for pregenerated doodles.")
+    parser.add_argument("--force", action="store_true", help="Rebuild variants even if images.json is up to date.")
+    args = parser.parse_args()
+
+    for day_dir in sorted(p.parent for p in PREGEN_DIR.glob(f"*/{SOURCE_FILENAME}")):
+        if not args.force and is_current(day_dir):
+            continue
+        manifest = build_variants(day_dir)
+        sizes = ", ".join(f"{v['format']}@{v['width']}" for v in manifest["variants"])
+        print(f"{day_dir.name}: {sizes or 'no variant formats available'}")
@@ -0,0 +1,125 @@
+"""
+Snapshots of finished days' leaderboards, so KV only holds a few hot days.
+
+Every `leaderboard:<date>` sorted set for a day before today is written to
+backend/leaderboard_archive/<date>.json.gz as two gzip-compressed columns
+(usernames and scores, in leaderboard order) and given a TTL, so KV drops it
+HOT_DAYS days after the day ended. Until then each daily run re-snapshots it,
+which also picks up writes that landed just after midnight and gives a failed
+commit of the archive another chance. Session ids are not archived: the files
+are committed to the repository and served publicly.
+
+Only the standard library and redis are needed, since daily_setup.py runs this in
+the scheduled workflow.
+"""
+import gzip
+import json
+import time
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+
+from atomic_files import atomic_write
+
+# Setup paths
+BASE_DIR = Path(__file__).parent.resolve()
+ARCHIVE_DIR = BASE_DIR / "backend" / "leaderboard_archive"
+
+LEADERBOARD_PREFIX = "leaderboard:"
+ARCHIVE_SUFFIX = ".json.gz"
+ARCHIVE_FORMAT = 1
+# Days a finished leaderboard stays in KV after its day ends
+HOT_DAYS = 3
+# A key is never expired sooner than this after its first snapshot, so at least
+# one more run can re-archive it (e.g. old keys found on the first run)
+MIN_GRACE_SECONDS = 36 * 3600
+# Members read per ZRANGE while snapshotting a large leaderboard
+SNAPSHOT_CHUNK_SIZE = 10000
+
+def archive_path(day, archive_dir=ARCHIVE_DIR):
+    return Path(archive_dir) / f"{day}{ARCHIVE_SUFFIX}"
+
+def archived_days(archive_dir=ARCHIVE_DIR):
+    """Dates with an archived leaderboard, oldest first."""
+    archive_dir = Path(archive_dir)
+    if not archive_dir.exists():
+        return []
+    days = []
+    for path in archive_dir.glob(f"*{ARCHIVE_SUFFIX}"):
+        try:
+            days.append(date.fromisoformat(path.name[: -len(ARCHIVE_SUFFIX)]))
+        except ValueError:
+            continue
+    return sorted(days)
+
+def write_archive(day, raw_leaderboard, archive_dir=ARCHIVE_DIR):
+    """
+    Writes a leaderboard given as ZRANGE (member, score) pairs. The gzip header
+    carries no timestamp, so an unchanged leaderboard produces identical bytes and
+    re-archiving it leaves nothing to commit.
+    """
+    usernames, scores = [], []
+    for member, score in raw_leaderboard:
+        usernames.append(json.loads(member).get("username"))
+        scores.append(int(score))
+    archive = {"format": ARCHIVE_FORMAT, "date": str(day), "count": len(scores), "usernames": usernames, "scores": scores}
+
+    path = archive_path(day, archive_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with atomic_write(path, "wb") as raw, gzip.GzipFile(fileobj=raw, mode="wb", mtime=0) as f:
+        f.write(json.dumps(archive, separators=(",", ":")).encode("utf-8"))
+    return path
+
+def read_archive(day, archive_dir=ARCHIVE_DIR):
+    """Returns an archived leaderboard ({"date", "count", "usernames", "scores"}), or None."""
+    path = archive_path(day, archive_dir)
+    if not path.exists():
+        return None
+    with gzip.open(path, "rb") as f:
+        return json.loads(f.read().decode("utf-8"))
+
+def archive_page(archive, offset, limit):
+    """One page of an archived leaderboard as [{"username", "score"}], best first."""
+    end = offset + limit
+    return [
+        {"username": username, "score": score}
+        for username, score in zip(archive["usernames"][offset:end], archive["scores"][offset:end])
+    ]
+
+def snapshot(client, key):
+    """Reads a whole sorted set in chunks, lowest scores first (like ZRANGE)."""
+    members = []
+    while True:
+        chunk = client.zrange(key, len(members), len(members) + SNAPSHOT_CHUNK_SIZE - 1, withscores=True)
+        members.extend(chunk)
+        if len(chunk) < SNAPSHOT_CHUNK_SIZE:
+            return members
+
+def expiry_for(day, now):
+    """Unix time a finished day's key should expire at: HOT_DAYS after the day ends, with a grace period."""
+    day_end = datetime.combine(day + timedelta(days=1), datetime.min.time(), tzinfo=timezone.utc)
+    return int(max((day_end + timedelta(days=HOT_DAYS)).timestamp(), now + MIN_GRACE_SECONDS))
+
+def archive_leaderboards(client, today=None, archive_dir=ARCHIVE_DIR):
+    """
+    Archives every finished day's leaderboard still in KV and sets a TTL on keys
+    that don't have one yet. `client` is a synchronous redis client. Returns the
+    archived dates, oldest first.
+    """
+    today = today or date.today()
+    now = time.time()
+    archived = []
+    for key in client.scan_iter(match=f"{LEADERBOARD_PREFIX}*", count=1000):
+        name = key.decode("utf-8") if isinstance(key, bytes) else key
+        try:
+            day = date.fromisoformat(name[len(LEADERBOARD_PREFIX):])
+        except ValueError:
+            continue
+        if day >= today:
+            continue
+
+        write_archive(day, snapshot(client, key), archive_dir)
+        archived.append(day)
+        # -1: no TTL yet. Later runs leave the expiry alone so it isn't pushed back
+        if client.ttl(key) == -1:
+            client.expireat(key, expiry_for(day, now))
+    return sorted(archived)
@@ -1,13 +1,21 @@
 from datetime import date
-import json
 import matplotlib.pyplot as plt
 from matplotlib.colors import LinearSegmentedColormap
 import numpy as np
 
+from daily_setup import PREGEN_DIR, read_manifest
+from game_data import load_game
+
 
 current_date = date.today()
-with open("lookup_files/lookup_"+str(current_date)+".json", 'r') as file:
-    lookup = json.load(file)
+manifest = read_manifest()
+if manifest is not None and manifest.get("date") == str(current_date):
+    game_dir = PREGEN_DIR / manifest["gameDir"]
+else:
+    game_dir = PREGEN_DIR / str(current_date)
+lookup = load_game(game_dir)
+if lookup is None:
+    raise SystemExit(f"No game found in {game_dir}.")
 
 seen = set()
 counter = 0
@@ -1,44 +1,56 @@
 import argparse
 import os
 import json
+import queue
+import threading
 import numpy as np
-import torch
+from collections import namedtuple
 from datetime import date, timedelta
 from pathlib import Path
 import random
-from diffusers import AutoPipelineForText2Image
-from concurrent.futures import ThreadPoolExecutor
 import time
 
+from ranking import rank_chunk, rank_chunks, ranks_to_lookup
+from image_variants import SOURCE_FILENAME, build_variants, is_current
+from game_data import VOCAB_FILENAME, JSON_FILENAME, build_vocab, save_vocab, align_ranks, write_game, load_game, validate_game
+from simulate import Solver
+from embed_store import load_vectors
+from word_lists import read_words
+from atomic_files import atomic_write
+
 # Setup paths
 BASE_DIR = Path(__file__).parent.resolve()
 BACKEND_DIR = BASE_DIR / "backend"
 PREGEN_DIR = BACKEND_DIR / "pregen_data"
 WORD_LIST_PATH = BASE_DIR / "word_list.txt"
-EMBED_STORE_PATH = BASE_DIR / "embed_store.npy"
 
 DRAWABLE_LIST_PATH = BASE_DIR / "drawable_words.txt"
 
+IMAGE_BACKENDS = ("cuda", "cpu", "placeholder")
+# "Bad Drawing" / Skribbl.io style prompt
+PROMPT_TEMPLATE = "a very bad drawing of a {word} in ms paint, thick black lines, white background, amateur, scribble, stick figure style, terrible art, pixelated lines"
+# Targets ranked per step of the lookup stage; small enough that the first images
+# start right away, large enough to keep the ranking matmuls efficient
+LOOKUP_CHUNK_SIZE = 64
+
+# Difficulty vetting (--difficulty-range): greedy solver games per target, and how
+# many replacement targets to try before keeping an out-of-range one
+DIFFICULTY_TRIALS = 3
+MAX_REPLACEMENTS = 10
+
+# One day of the run: what still has to be written for it
+DayJob = namedtuple("DayJob", ["day_dir", "word", "index", "needs_lookup", "needs_image"])
+
 def load_data():
     print("Loading word list and embeddings...")
-    with open(WORD_LIST_PATH, "r", encoding="utf-8") as f:
-        words = [line.strip() for line in f if line.strip()]
-    
-    embeddings = np.load(EMBED_STORE_PATH)
-    
-    # Ensure dimensions match
-    if len(words) != embeddings.shape[1]:
-        print(f"Warning: Word list length ({len(words)}) does not match embedding columns ({embeddings.shape[1]}). Truncating to minimum.")
-        min_len = min(len(words), embeddings.shape[1])
-        words = words[:min_len]
-        embeddings = embeddings[:, :min_len]
+    # Raises if the list and the store don't match; truncating would pair words with the wrong vectors
+    words, normalized = load_vectors(WORD_LIST_PATH)
     
     # Load drawable words if available
     drawable_indices = []
     if os.path.exists(DRAWABLE_LIST_PATH):
         print(f"Loading drawable words from {DRAWABLE_LIST_PATH}...")
-        with open(DRAWABLE_LIST_PATH, "r", encoding="utf-8") as f:
-            drawable_set = set(line.strip() for line in f if line.strip())
+        drawable_set = set(read_words(DRAWABLE_LIST_PATH))
         
         # Find indices of drawable words in the main list
         for i, word in enumerate(words):
@@ -50,130 +62,298 @@ def load_data():
         print("Warning: No drawable words found or file missing. Falling back to all words.")
         drawable_indices = list(range(len(words)))
         
-    return words, embeddings, drawable_indices
+    return words, normalized, drawable_indices
 
-def get_similarity_ranks(target_index, embeddings, words):
-    # Get target vector (384,)
-    target_vector = embeddings[:, target_index]
-    
-    # Normalize target vector
-    target_norm = np.linalg.norm(target_vector)
-    if target_norm > 0:
-        target_vector = target_vector / target_norm
-        
-    # Normalize all embeddings (384, N)
-    # Note: Doing this once outside would be faster, but memory might be an issue if huge. 
-    # For 10k words it's fine.
-    norms = np.linalg.norm(embeddings, axis=0)
-    norms[norms == 0] = 1 # Avoid divide by zero
-    normalized_embeddings = embeddings / norms
-    
-    # Calculate cosine similarity: dot product
-    # (384,) dot (384, N) -> (N,)
-    similarities = np.dot(target_vector, normalized_embeddings)
-    
-    # Sort indices by similarity (descending)
-    # We want rank 0 = most similar (the word itself)
-    sorted_indices = np.argsort(similarities)[::-1]
-    
-    # Create lookup dict: word -> rank
-    # rank 0 is the word itself
-    lookup = {}
-    for rank, idx in enumerate(sorted_indices):
-        word = words[idx]
-        lookup[word] = rank
-        
-    return lookup
+def setup_pipeline(backend="cuda"):
+    """
+    Returns a renderer mapping a batch of target words to PIL images. "cuda" and
+    "cpu" run SDXL Turbo; "placeholder" draws deterministic scribbles with Pillow
+    so the whole pipeline can be exercised without a model or GPU.
+    """
+    if backend == "placeholder":
+        return render_placeholders
+
+    # Imported here so that --lookups-only and placeholder runs never pull in torch/diffusers
+    import torch
+    from diffusers import AutoPipelineForText2Image
 
-def setup_pipeline():
-    print("Loading SDXL Turbo pipeline...")
+    if backend == "cuda" and not torch.cuda.is_available():
+        raise SystemExit("CUDA is not available; use --image-backend cpu or placeholder.")
+
+    print(f"Loading SDXL Turbo pipeline on {backend}...")
     pipe = AutoPipelineForText2Image.from_pretrained(
         "stabilityai/sdxl-turbo",
-        torch_dtype=torch.float16,
+        # Half precision is only fast (and fully supported) on the GPU
+        torch_dtype=torch.float16 if backend == "cuda" else torch.float32,
         variant="fp16",
         use_safetensors=True
-    ).to("cuda")
+    ).to(backend)
     
     # Turbo doesn't need the LoRA as much if prompted well, and it's faster without extra weights
     # pipe.load_lora_weights(...) 
-    return pipe
 
-def generate_images_batch(pipe, prompts, output_paths):
+    def render(words):
+        prompts = [PROMPT_TEMPLATE.format(word=word) for word in words]
+        # SDXL Turbo needs guidance_scale=0.0 and few steps (1-4)
+        return pipe(prompts, guidance_scale=0.0, num_inference_steps=2).images
+
+    return render
+
+def render_placeholders(words, size=512):
+    """Stand-in doodles: a few random thick strokes seeded by the word, plus its label."""
+    from PIL import Image, ImageDraw
+
+    images = []
+    for word in words:
+        rng = random.Random(word)
+        image = Image.new("RGB", (size, size), "white")
+        draw = ImageDraw.Draw(image)
+        for _ in range(rng.randint(3, 6)):
+            points = [(rng.randint(32, size - 32), rng.randint(32, size - 96)) for _ in range(rng.randint(2, 5))]
+            draw.line(points, fill="black", width=rng.randint(4, 10), joint="curve")
+        draw.text((16, size - 40), word, fill="black")
+        images.append(image)
+    return images
+
+def generate_images_batch(render, words, output_paths):
     # Generate images in batch
-    print(f"Generating batch of {len(prompts)} images with SDXL Turbo...")
-    # SDXL Turbo needs guidance_scale=0.0 and few steps (1-4)
-    images = pipe(prompts, guidance_scale=0.0, num_inference_steps=2).images
+    print(f"Generating batch of {len(words)} images...")
+    images = render(words)
     
     for img, path in zip(images, output_paths):
-        img.save(path)
+        # Written under a temporary name so an interrupted run never leaves a partial image
+        with atomic_write(path, "wb") as f:
+            img.save(f, format="PNG")
+        # Resized WebP/AVIF copies with content-hashed names for the backend to serve
+        build_variants(path.parent)
 
-def process_day(idx, target_date, words, embeddings):
-    # CPU-bound task: calculate lookup
-    target_word = words[idx]
-    date_str = str(target_date)
-    
-    # Create directory
-    day_dir = PREGEN_DIR / date_str
-    day_dir.mkdir(parents=True, exist_ok=True)
-    
-    print(f"Calculating lookup for {date_str}: '{target_word}'")
-    lookup = get_similarity_ranks(idx, embeddings, words)
-    
-    with open(day_dir / "lookup.json", "w", encoding="utf-8") as f:
-        json.dump(lookup, f)
-        
-    return day_dir / "image.png", target_word
+def existing_target(day_dir, vocab):
+    """The target word of a day's already written game, or None if it has no valid game."""
+    try:
+        game = load_game(day_dir, vocab)
+        if game is None:
+            return None
+        validate_game(game)
+    except (OSError, ValueError):
+        return None
+    return game.word_at(0)
+
+def has_valid_image(day_dir):
+    """
+    True if a day's image exists (images are written atomically, so an existing one
+    is complete). Stale or missing optimized variants are rebuilt on the spot.
+    """
+    if not (day_dir / SOURCE_FILENAME).exists():
+        return False
+    if not is_current(day_dir):
+        build_variants(day_dir)
+    return True
+
+def plan_days(start_date, n_days, words, vocab, drawable_indices, resume=True, check_images=True):
+    """
+    Decides what each day of the run still needs. With `resume`, days that already
+    have a valid game keep their target (and image, if valid); new targets are drawn
+    from the drawable words not already used by the run. Without `check_images`
+    (lookups only) existing images are not inspected, so Pillow isn't needed.
+    """
+    word_index = {word: i for i, word in enumerate(words)}
+    day_dirs = [PREGEN_DIR / str(start_date + timedelta(days=i)) for i in range(n_days)]
+    targets = [existing_target(day_dir, vocab) if resume else None for day_dir in day_dirs]
+    # Legacy lookup.json days carry their own vocabulary; one whose target has since
+    # left the word list can't be kept and gets a new game
+    targets = [word if word in word_index else None for word in targets]
+
+    used = {word_index[word] for word in targets if word is not None}
+    available = [i for i in drawable_indices if i not in used]
+    n_new = targets.count(None)
+    if len(available) < n_new:
+        print(f"Warning: Not enough drawable words ({len(available)}) for {n_new} days. Repetition may occur.")
+        new_indices = [random.choice(drawable_indices) for _ in range(n_new)]
+    else:
+        new_indices = random.sample(available, n_new)
+
+    jobs = []
+    new_indices = iter(new_indices)
+    for day_dir, word in zip(day_dirs, targets):
+        if word is not None:
+            needs_image = not has_valid_image(day_dir) if check_images else not (day_dir / SOURCE_FILENAME).exists()
+            jobs.append(DayJob(day_dir, word, word_index[word], False, needs_image))
+        else:
+            index = next(new_indices)
+            jobs.append(DayJob(day_dir, words[index], index, True, True))
+    return jobs
+
+class TargetVetter:
+    """
+    Rejects targets whose difficulty, measured as the median number of guesses the
+    greedy solver bot needs (see simulate.py), falls outside `difficulty_range`,
+    replacing them with unused drawable words.
+    """
+
+    def __init__(self, words, normalized, difficulty_range, spare_indices):
+        self.words = words
+        self.low, self.high = difficulty_range
+        self.spares = list(spare_indices)
+        self.solver = Solver(words, normalized, max_guesses=self.high + 1)
+        # Replacement targets are ranked against the solver's decoded copy
+        self.normalized = self.solver.vectors
+
+    def difficulty(self, ranks):
+        return float(np.median(self.solver.guess_counts(ranks, "greedy", DIFFICULTY_TRIALS)))
+
+    def vet(self, job, ranks):
+        """
+        Returns (job, ranks), with a replacement target if the original is out of
+        range. If no candidate lands in range, the measured one closest to it is kept.
+        """
+        best = None
+        for attempt in range(MAX_REPLACEMENTS + 1):
+            guesses = self.difficulty(ranks)
+            # Guesses outside [low, high]; 0 when in range
+            miss = max(self.low - guesses, guesses - self.high, 0.0)
+            if best is None or miss < best[0]:
+                best = (miss, job, ranks)
+            if miss == 0 or not self.spares or attempt == MAX_REPLACEMENTS:
+                break
+            index = self.spares.pop()
+            print(f"Rejecting '{job.word}' for {job.day_dir.name} ({guesses:.0f} guesses); trying '{self.words[index]}'.")
+            job = job._replace(word=self.words[index], index=index)
+            ranks = rank_chunk(self.normalized, [index])[0]
+
+        miss, job, ranks = best
+        if miss > 0:
+            print(f"No target in range for {job.day_dir.name}; keeping the closest, '{job.word}'.")
+        return job, ranks
+
+def write_lookups(jobs, rank_arrays, words, vocab, write_json=False, vetter=None):
+    """
+    Writes each day's game from its target's rank array in the binary format (see
+    game_data.py), optionally also as a legacy lookup.json. Returns the jobs as
+    written (targets may have been replaced by `vetter`).
+    """
+    written = []
+    for job, ranks in zip(jobs, rank_arrays):
+        if vetter is not None:
+            job, ranks = vetter.vet(job, ranks)
+        written.append(job)
+        print(f"Writing lookup for {job.day_dir.name}: '{job.word}'")
+        write_game(job.day_dir, align_ranks(ranks, words, vocab))
+        if write_json:
+            with open(job.day_dir / JSON_FILENAME, "w", encoding="utf-8") as f:
+                json.dump(ranks_to_lookup(ranks, words), f)
+    return written
+
+def produce_lookups(jobs, words, vocab, normalized, image_queue, workers=None, write_json=False, difficulty_range=None, spare_indices=()):
+    """
+    Lookup stage (CPU): writes the missing games chunk by chunk and hands every day
+    that still needs an image to the image stage. The chunks' targets are ranked
+    by one process pool for the whole run (see ranking.rank_chunks), ahead of the
+    chunk being written. Ends the queue with None, or with the exception that
+    stopped it.
+    """
+    try:
+        vetter = TargetVetter(words, normalized, difficulty_range, spare_indices) if difficulty_range is not None else None
+        chunks = [jobs[start : start + LOOKUP_CHUNK_SIZE] for start in range(0, len(jobs), LOOKUP_CHUNK_SIZE)]
+        to_rank = [[job for job in chunk if job.needs_lookup] for chunk in chunks]
+        rank_arrays = rank_chunks(normalized, [[job.index for job in chunk_jobs] for chunk_jobs in to_rank], workers)
+        for chunk, chunk_jobs, ranks in zip(chunks, to_rank, rank_arrays):
+            written = {job.day_dir: job for job in write_lookups(chunk_jobs, ranks, words, vocab, write_json, vetter)}
+            for job in (written.get(job.day_dir, job) for job in chunk):
+                if job.needs_image and image_queue is not None:
+                    image_queue.put(job)
+    except BaseException as e:
+        if image_queue is not None:
+            image_queue.put(e)
+        raise
+    if image_queue is not None:
+        image_queue.put(None)
+
+def consume_images(render, image_queue, batch_size):
+    """Image stage (GPU): renders days from the queue in batches until the lookup stage is done."""
+    finished = False
+    while not finished:
+        batch = []
+        while len(batch) < batch_size:
+            job = image_queue.get()
+            if isinstance(job, BaseException):
+                raise RuntimeError("Lookup stage failed.") from job
+            if job is None:
+                finished = True
+                break
+            batch.append(job)
+        if batch:
+            generate_images_batch(render, [job.word for job in batch], [job.day_dir / SOURCE_FILENAME for job in batch])
+
+def run_pipeline(jobs, words, vocab, normalized, render=None, batch_size=4, workers=None, write_json=False, difficulty_range=None, spare_indices=()):
+    """
+    Runs both stages concurrently: lookups are computed in a background thread
+    (numpy releases the GIL) and passed through a bounded queue, so the image stage
+    starts after the first chunk and the lookup stage never runs far ahead of it.
+    Without `render`, only the lookups are written.
+    """
+    if render is None:
+        produce_lookups(jobs, words, vocab, normalized, None, workers, write_json, difficulty_range, spare_indices)
+        return
+
+    image_queue = queue.Queue(maxsize=2 * max(batch_size, LOOKUP_CHUNK_SIZE))
+    producer = threading.Thread(
+        target=produce_lookups,
+        args=(jobs, words, vocab, normalized, image_queue, workers, write_json, difficulty_range, spare_indices),
+        daemon=True,
+    )
+    producer.start()
+    consume_images(render, image_queue, batch_size)
+    producer.join()
+
+def verify_days(jobs, vocab, check_images=True):
+    """Returns the names of the run's days that still lack a valid game or image."""
+    return [
+        job.day_dir.name for job in jobs
+        if existing_target(job.day_dir, vocab) is None or (check_images and not is_current(job.day_dir))
+    ]
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate Pixelo game data for the next N days.")
     parser.add_argument("--days", type=int, default=30, help="Number of days to generate.")
     parser.add_argument("--start_offset", type=int, default=0, help="Start generating from today + offset days.")
     parser.add_argument("--batch_size", type=int, default=4, help="Batch size for image generation.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes used for ranking large runs (default: CPU count).")
+    parser.add_argument("--lookups-only", action="store_true", help="Only write lookup files; never loads torch/diffusers.")
+    parser.add_argument("--write-json", action="store_true", help="Also write the legacy lookup.json next to the binary game.")
+    parser.add_argument("--image-backend", choices=IMAGE_BACKENDS, default="cuda", help="Where to render images; 'placeholder' needs only Pillow.")
+    parser.add_argument("--difficulty-range", type=int, nargs=2, metavar=("MIN", "MAX"), default=None, help="Replace targets the greedy solver bot needs fewer than MIN or more than MAX guesses for.")
+    parser.add_argument("--no-resume", action="store_true", help="Regenerate every day instead of keeping days that already have valid output.")
     args = parser.parse_args()
     
-    words, embeddings, drawable_indices = load_data()
-    
-    # Select random words from drawable list
-    if len(drawable_indices) < args.days:
-        print(f"Warning: Not enough drawable words ({len(drawable_indices)}) for {args.days} days. Repetition may occur.")
-        selected_indices = [random.choice(drawable_indices) for _ in range(args.days)]
-    else:
-        selected_indices = random.sample(drawable_indices, args.days)
-    
-    pipe = setup_pipeline()
+    words, normalized, drawable_indices = load_data()
+    vocab = build_vocab(words)
+    PREGEN_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        save_vocab(PREGEN_DIR / VOCAB_FILENAME, vocab)
+    except ValueError as e:
+        raise SystemExit(f"{e} If update_vocab.py was interrupted, run it again to finish patching them.")
     
     today = date.today()
     start_date = today + timedelta(days=args.start_offset)
     print(f"Generating data for {args.days} days starting from {start_date}...")
-    
-    # Prepare tasks
-    tasks = []
-    for i, idx in enumerate(selected_indices):
-        target_date = start_date + timedelta(days=i)
-        tasks.append((idx, target_date))
-    
-    # We will process in chunks of batch_size
-    for i in range(0, len(tasks), args.batch_size):
-        batch_tasks = tasks[i : i + args.batch_size]
-        
-        # 1. Run CPU tasks (lookup generation) in parallel
-        image_paths = []
-        prompts = []
-        
-        with ThreadPoolExecutor() as executor:
-            futures = []
-            for idx, target_date in batch_tasks:
-                futures.append(executor.submit(process_day, idx, target_date, words, embeddings))
-            
-            for future in futures:
-                img_path, target_word = future.result()
-                image_paths.append(img_path)
-                # "Bad Drawing" / Skribbl.io style prompt
-                prompt = f"a very bad drawing of a {target_word} in ms paint, thick black lines, white background, amateur, scribble, stick figure style, terrible art, pixelated lines"
-                prompts.append(prompt)
-        
-        # 2. Run GPU task (image generation) in batch
-        if prompts:
-            generate_images_batch(pipe, prompts, image_paths)
-            
+
+    jobs = plan_days(start_date, args.days, words, vocab, drawable_indices, resume=not args.no_resume, check_images=not args.lookups_only)
+    n_lookups = sum(job.needs_lookup for job in jobs)
+    n_images = 0 if args.lookups_only else sum(job.needs_image for job in jobs)
+    print(f"{n_lookups} lookups and {n_images} images to generate; {args.days - max(n_lookups, n_images)} days already complete.")
+
+    started = time.perf_counter()
+    render = setup_pipeline(args.image_backend) if n_images else None
+    if args.lookups_only:
+        print("Skipping image generation (--lookups-only).")
+    # Unused drawable words, in random order, to replace rejected targets
+    used = {job.index for job in jobs}
+    spare_indices = [i for i in dict.fromkeys(drawable_indices) if i not in used]
+    random.shuffle(spare_indices)
+    run_pipeline(jobs, words, vocab, normalized, render, args.batch_size, args.workers, args.write_json, args.difficulty_range, spare_indices)
+    print(f"Generated in {time.perf_counter() - started:.2f}s.")
+
+    incomplete = verify_days(jobs, vocab, check_images=not args.lookups_only)
+    if incomplete:
+        raise SystemExit(f"{len(incomplete)} days are incomplete: {', '.join(incomplete)}")
     print("Generation complete!")
@@ -0,0 +1,151 @@
+import os
+import numpy as np
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+# Number of targets scored per matrix multiply. A chunk needs roughly
+# chunk * N * (4 + 8) bytes (float32 scores + int64 argsort), so 256 targets over
+# 25k words stays around 75 MB.
+DEFAULT_CHUNK_SIZE = 256
+
+# Below this many targets, spinning up a process pool costs more than it saves.
+PARALLEL_THRESHOLD = 512
+
+# Vocabulary rows scored per matrix multiply. A quantized store
+# (embed_store.QuantizedVectors) is decoded to float32 one block at a time, so
+# 8192 rows x 384 dims keeps the decoded copy at 12 MB.
+SCORE_BLOCK_SIZE = 8192
+
+def normalize_embeddings(embeddings):
+    """
+    Converts a (384, N) column-per-word embedding matrix into a row-major (N, 384)
+    float32 matrix of unit vectors. Done once per run instead of once per day.
+    """
+    # Always a copy: a column-major store maps straight onto (N, 384) and may be read-only
+    vectors = np.array(np.asarray(embeddings).T, dtype=np.float32, order="C")
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1 # Avoid divide by zero
+    vectors /= norms
+    return vectors
+
+def similarities(vectors, queries, block_size=SCORE_BLOCK_SIZE):
+    """
+    Cosine similarities of `queries` (T, 384 float32 unit rows) to every row of
+    `vectors`, as a (T, N) float32 array. `vectors` is a normalized float32 matrix
+    or a QuantizedVectors; only one block of its rows is float32 at a time.
+    """
+    scores = np.empty((len(queries), len(vectors)), dtype=np.float32)
+    for start in range(0, len(vectors), block_size):
+        block = vectors[start : start + block_size]
+        scores[:, start : start + len(block)] = queries @ block.T
+    return scores
+
+def rank_chunk(normalized, target_indices):
+    """
+    Scores a chunk of targets against the whole vocabulary (see `similarities`).
+    Returns a (len(target_indices), N) array where row t, column i holds the rank
+    of word i for target t. Rank 0 is always the target itself.
+    """
+    target_indices = np.asarray(target_indices, dtype=np.intp)
+    n_targets, n_words = len(target_indices), len(normalized)
+
+    # (T, 384) @ (384, N) -> (T, N) cosine similarities
+    scores = similarities(normalized, normalized[target_indices])
+    rows = np.arange(n_targets)
+    # Guarantee the target wins even if another word shares its exact vector
+    scores[rows, target_indices] = np.inf
+
+    # Sort by similarity (descending); stable so ties keep vocabulary order
+    order = np.argsort(-scores, axis=1, kind="stable")
+
+    # Invert the permutations with a scatter: ranks[t, order[t, r]] = r
+    ranks = np.empty((n_targets, n_words), dtype=np.int32)
+    ranks[rows[:, None], order] = np.arange(n_words, dtype=np.int32)
+    return ranks
+
+def insert_into_order(order, normalized, new_indices):
+    """
+    Inserts new words into an existing ranking without re-ranking the others.
+    `order` lists row indices of `normalized` (a float32 matrix or a
+    QuantizedVectors) best first (order[0] is the target);
+    each new word's place is found by binary search over the existing ranking,
+    computing similarities only for the words it is compared with, so the cost is
+    O(k log N) dot products for k new words. Returns the extended order.
+    """
+    order = np.asarray(order, dtype=np.int64)
+    new_indices = np.asarray(new_indices, dtype=np.int64)
+    if len(new_indices) == 0:
+        return order
+
+    target = normalized[order[0]]
+    new_similarities = normalized[new_indices] @ target
+    # Position = number of existing words at least as similar (the target always is)
+    low = np.ones(len(new_indices), dtype=np.int64)
+    high = np.full(len(new_indices), len(order), dtype=np.int64)
+    while (active := low < high).any():
+        mid = (low + high) // 2
+        mid_similarities = np.einsum("ij,j->i", normalized[order[np.where(active, mid, 0)]], target)
+        ahead = active & (mid_similarities >= new_similarities)
+        low = np.where(ahead, mid + 1, low)
+        high = np.where(active & ~ahead, mid, high)
+
+    # New words landing in the same gap are ordered among themselves by similarity
+    placement = np.lexsort((-new_similarities, low))
+    return np.insert(order, low[placement], new_indices[placement])
+
+# --- Process pool plumbing ---
+# Workers receive the normalized matrix once through the initializer instead of
+# once per task.
+_worker_vectors = None
+
+def _init_worker(normalized):
+    global _worker_vectors
+    _worker_vectors = normalized
+
+def _rank_chunk_in_worker(target_indices):
+    return rank_chunk(_worker_vectors, target_indices)
+
+def rank_chunks(normalized, chunks, workers=None):
+    """
+    Yields the rank arrays (see rank_chunk) of each chunk of target indices, in order.
+
+    Runs of fewer than PARALLEL_THRESHOLD targets in total are scored in-process.
+    Larger runs share one process pool for all their chunks (`workers` defaults to
+    the CPU count, pass 1 to force a single process), which ranks up to two chunks
+    per worker ahead of the caller, so a caller that writes each chunk as it
+    arrives keeps every worker busy however small the chunks are.
+    """
+    chunks = [np.asarray(chunk, dtype=np.intp) for chunk in chunks]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(chunks))
+
+    if workers <= 1 or sum(len(chunk) for chunk in chunks) < PARALLEL_THRESHOLD:
+        for chunk in chunks:
+            yield rank_chunk(normalized, chunk)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(normalized,)) as executor:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(executor.submit(_rank_chunk_in_worker, chunk))
+            if len(pending) > 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+def compute_rank_arrays(normalized, target_indices, chunk_size=DEFAULT_CHUNK_SIZE, workers=None):
+    """
+    Computes rank arrays for every target in `target_indices`, split into chunks of
+    `chunk_size` (see rank_chunks). Returns a (T, N) int32 array in the same order
+    as `target_indices`.
+    """
+    target_indices = np.asarray(target_indices, dtype=np.intp)
+    chunks = [target_indices[i : i + chunk_size] for i in range(0, len(target_indices), chunk_size)]
+    if not chunks:
+        return np.empty((0, len(normalized)), dtype=np.int32)
+    return np.concatenate(list(rank_chunks(normalized, chunks, workers)))
+
+def ranks_to_lookup(ranks, words):
+    """Turns one rank array into the `word -> rank` dict stored in lookup.json."""
+    return dict(zip(words, ranks.tolist()))
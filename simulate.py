@@ -0,0 +1,178 @@
+"""
+Headless solver bots for measuring how hard pregenerated days are.
+
+Every game in backend/pregen_data is played several times by each bot and the
+number of guesses to solve it is reported per day, with days far from the typical
+difficulty flagged as outliers. Bots are simple player models over the same
+embeddings the games were ranked with:
+
+    greedy   always guesses the closest unguessed neighbour of its best guess so far
+    random   like greedy, but picks among the few closest neighbours at random and
+             sometimes guesses an unrelated common word instead
+
+Days are spread over a process pool; pregenerate_data.py reuses `Solver` to reject
+targets whose difficulty is out of range before their images are generated.
+"""
+import argparse
+import json
+import os
+import random
+from bisect import insort
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from game_data import load_game
+from embed_store import load_vectors
+from ranking import similarities
+
+# Setup paths
+BASE_DIR = Path(__file__).parent.resolve()
+PREGEN_DIR = BASE_DIR / "backend" / "pregen_data"
+WORD_LIST_PATH = BASE_DIR / "word_list.txt"
+
+BOTS = ("greedy", "random")
+MAX_GUESSES = 300 # games not solved by then count as failures
+TRIALS = 5
+# Openers and exploratory guesses come from the most frequent words
+COMMON_WORDS = 5000
+NEIGHBORS = 256
+RANDOM_EXPLORE = 0.2
+RANDOM_CHOICES = 5
+# Robust z-score (on log guesses) above which a day is reported as an outlier
+OUTLIER_Z = 3.0
+
+class Solver:
+    """Plays games given as rank arrays aligned with `words` (-1 for unknown words)."""
+
+    def __init__(self, words, vectors, max_guesses=MAX_GUESSES):
+        self.words = words
+        # Decoded once (see embed_store.QuantizedVectors.decode): every game looks up hundreds of neighbours
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.max_guesses = max_guesses
+        self.n_common = min(COMMON_WORDS, len(words))
+        self._neighbors = {}
+
+    def neighbors(self, i):
+        """The NEIGHBORS closest words to word i, closest first (cached)."""
+        found = self._neighbors.get(i)
+        if found is None:
+            scores = similarities(self.vectors, self.vectors[[i]])[0]
+            scores[i] = -np.inf
+            top = np.argpartition(-scores, NEIGHBORS)[:NEIGHBORS]
+            found = self._neighbors[i] = top[np.argsort(-scores[top])].tolist()
+        return found
+
+    def _next_guess(self, bot, best, guessed, rng):
+        if bot == "random" and rng.random() < RANDOM_EXPLORE:
+            return self._random_guess(guessed, rng)
+        # Walk outward from the best guesses until an unguessed neighbour turns up
+        for _, i in best:
+            options = [j for j in self.neighbors(i) if j not in guessed]
+            if options:
+                return options[0] if bot == "greedy" else rng.choice(options[:RANDOM_CHOICES])
+        return self._random_guess(guessed, rng)
+
+    def _random_guess(self, guessed, rng):
+        while True:
+            i = rng.randrange(self.n_common)
+            if i not in guessed:
+                return i
+
+    def play(self, ranks, bot="greedy", seed=0):
+        """Returns the number of guesses `bot` needs to find rank 0, or None if it gives up."""
+        rng = random.Random(seed)
+        guessed = set()
+        best = [] # (rank, word index), best first
+        guess = self._random_guess(guessed, rng)
+        for n_guesses in range(1, self.max_guesses + 1):
+            guessed.add(guess)
+            rank = int(ranks[guess])
+            if rank == 0:
+                return n_guesses
+            if rank > 0:
+                insort(best, (rank, guess))
+            guess = self._next_guess(bot, best, guessed, rng)
+        return None
+
+    def guess_counts(self, ranks, bot="greedy", trials=TRIALS):
+        """Guesses to solve over `trials` games; failures count as max_guesses + 1."""
+        return [self.play(ranks, bot, seed) or self.max_guesses + 1 for seed in range(trials)]
+
+def load_solver(max_guesses=MAX_GUESSES):
+    words, vectors = load_vectors(WORD_LIST_PATH)
+    return Solver(words, vectors, max_guesses)
+
+# --- Process pool plumbing ---
+_worker_solver = None
+
+def _init_worker(max_guesses):
+    global _worker_solver
+    _worker_solver = load_solver(max_guesses)
+
+def _simulate_day_in_worker(args):
+    day_dir, bots, trials = args
+    return simulate_day(_worker_solver, day_dir, bots, trials)
+
+def simulate_day(solver, day_dir, bots=BOTS, trials=TRIALS):
+    game = load_game(day_dir)
+    ranks = game.ranks_for(solver.words)
+    return {
+        "day": Path(day_dir).name,
+        "target": game.word_at(0),
+        "guesses": {bot: solver.guess_counts(ranks, bot, trials) for bot in bots},
+    }
+
+def find_outliers(results, bot, threshold=OUTLIER_Z):
+    """Days whose median guesses are far from the typical day, as {day: robust z-score}."""
+    medians = np.log([np.median(result["guesses"][bot]) for result in results])
+    deviations = medians - np.median(medians)
+    # Median absolute deviation, or the mean one when most days are identical
+    scale = np.median(np.abs(deviations)) / 0.6745 or np.mean(np.abs(deviations)) * 1.2533
+    if scale == 0:
+        return {}
+    z_scores = deviations / scale
+    return {result["day"]: float(z) for result, z in zip(results, z_scores) if abs(z) > threshold}
+
+def game_days(pregen_dir=PREGEN_DIR):
+    return sorted(p for p in pregen_dir.iterdir() if p.is_dir() and load_game(p) is not None)
+
+def print_report(results, bots, max_guesses):
+    header = f"{'day':<12} {'target':<16}" + "".join(f" {bot + ' p50/p90/solved':>24}" for bot in bots)
+    print(header)
+    for result in results:
+        row = f"{result['day']:<12} {result['target']:<16}"
+        for bot in bots:
+            counts = np.array(result["guesses"][bot])
+            solved = (counts <= max_guesses).mean()
+            row += f" {np.median(counts):>10.0f}/{np.percentile(counts, 90):>5.0f}/{solved:>6.0%}"
+        print(row)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play every pregenerated game with solver bots and report difficulty.")
+    parser.add_argument("--bots", nargs="+", choices=BOTS, default=list(BOTS), help="Bots to run.")
+    parser.add_argument("--trials", type=int, default=TRIALS, help="Games per bot and day (different openers).")
+    parser.add_argument("--max-guesses", type=int, default=MAX_GUESSES, help="Give up after this many guesses.")
+    parser.add_argument("--workers", type=int, default=None, help="Processes to use (default: CPU count).")
+    parser.add_argument("--outlier-z", type=float, default=OUTLIER_Z, help="Robust z-score that marks a day as an outlier.")
+    parser.add_argument("--output", type=Path, default=None, help="Also write the per-day results as JSON.")
+    args = parser.parse_args()
+
+    days = game_days()
+    print(f"Simulating {len(days)} days with {', '.join(args.bots)} ({args.trials} trials each)...")
+    tasks = [(day_dir, args.bots, args.trials) for day_dir in days]
+    workers = min(args.workers or os.cpu_count() or 1, max(len(tasks), 1))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(args.max_guesses,)) as executor:
+        results = list(executor.map(_simulate_day_in_worker, tasks))
+
+    print_report(results, args.bots, args.max_guesses)
+    outliers = {bot: find_outliers(results, bot, args.outlier_z) for bot in args.bots} if len(results) > 2 else {}
+    for bot, days_z in outliers.items():
+        for day, z in sorted(days_z.items()):
+            print(f"Outlier for {bot}: {day} ({'hard' if z > 0 else 'easy'}, z={z:.1f})")
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"results": results, "outliers": outliers}, f, indent=2)
+        print(f"Wrote results to {args.output}")
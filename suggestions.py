@@ -0,0 +1,147 @@
+"""
+"Did you mean" suggestions for guesses that aren't in the vocabulary.
+
+A SymSpell-style deletion index: every word is indexed under all strings obtained by
+deleting up to MAX_EDIT_DISTANCE characters from its first PREFIX_LENGTH characters.
+A misspelled guess generates its own deletes, and any word sharing one of them is a
+candidate, verified with a real edit distance. Delete strings are stored as CRC32
+keys in a sorted numpy array (collisions only add candidates that fail verification),
+so the index is a few flat arrays instead of a dict of ~500k strings.
+"""
+import zlib
+import numpy as np
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+MAX_SUGGESTIONS = 3
+
+def deletes(word, max_distance=MAX_EDIT_DISTANCE):
+    """All strings reachable from `word` by deleting up to `max_distance` characters."""
+    results = {word}
+    frontier = {word}
+    for _ in range(max_distance):
+        frontier = {w[:i] + w[i + 1:] for w in frontier if len(w) > 1 for i in range(len(w))}
+        results |= frontier
+    return results
+
+def edit_distances(query, codes, lengths, max_distance=MAX_EDIT_DISTANCE):
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions)
+    from `query` to many words at once. `codes` holds the words as zero-padded
+    code points, one row per word. The DP runs row by row over the query with each
+    row vectorized across all words and columns; insertions are resolved with a
+    running minimum. Only columns up to len(query) + max_distance are computed, so
+    words longer than that must be filtered out beforehand.
+    """
+    n_words, width = len(codes), min(codes.shape[1], len(query) + max_distance)
+    codes = codes[:, :width].astype(np.int64)
+    target = [ord(c) for c in query]
+    cols = np.arange(width + 1)
+
+    previous2 = None
+    previous = np.broadcast_to(cols, (n_words, width + 1))
+    for i in range(1, len(target) + 1):
+        current = np.empty((n_words, width + 1), dtype=np.int64)
+        current[:, 0] = i
+        # Substitution (or match) and deletion
+        current[:, 1:] = np.minimum(previous[:, :-1] + (codes != target[i - 1]), previous[:, 1:] + 1)
+        if i > 1 and width > 1:
+            swapped = (codes[:, 1:] == target[i - 2]) & (codes[:, :-1] == target[i - 1])
+            current[:, 2:] = np.where(swapped, np.minimum(current[:, 2:], previous2[:, :-2] + 1), current[:, 2:])
+        # Insertion: current[j] = min over k <= j of current[k] + (j - k)
+        current = np.minimum.accumulate(current - cols, axis=1) + cols
+        previous2, previous = previous, current
+    return previous[np.arange(n_words), lengths]
+
+def _key(text):
+    return zlib.crc32(text.encode("utf-8"))
+
+def normalized_forms(word):
+    """Case and simple plural/singular variants of a guess, most likely first (none if blank)."""
+    word = word.strip().lower()
+    if not word:
+        return []
+    forms = [word]
+    if word.endswith("ies") and len(word) > 4:
+        forms.append(word[:-3] + "y")
+    if word.endswith("es") and len(word) > 3:
+        forms.append(word[:-2])
+    if word.endswith("s") and len(word) > 2:
+        forms.append(word[:-1])
+    else:
+        forms += [word + "s", word + "es"]
+    return forms
+
+def encode_words(words):
+    """Word lengths and zero-padded code points (one row per word) for edit_distances."""
+    lengths = np.array([len(word) for word in words], dtype=np.int64)
+    codes = np.zeros((len(words), max(lengths, default=0)), dtype=np.uint32)
+    for i, word in enumerate(words):
+        codes[i, : len(word)] = [ord(c) for c in word]
+    return lengths, codes
+
+class SuggestionIndex:
+    """
+    Suggestion index over a word list. Words earlier in the list (word_list.txt is
+    ordered by frequency) win ties between equally close candidates. Apart from the
+    words themselves the index is a handful of flat arrays (see `arrays`), so it
+    can be built once and memory-mapped by every worker.
+    """
+
+    def __init__(self, words, keys, word_ids, lengths, codes):
+        self.words = words
+        self.positions = {word: i for i, word in enumerate(words)}
+        self.keys = keys
+        self.word_ids = word_ids
+        self.lengths = lengths
+        self.codes = codes
+
+    @classmethod
+    def build(cls, words):
+        keys, word_ids = [], []
+        for i, word in enumerate(words):
+            for deleted in deletes(word[:PREFIX_LENGTH]):
+                keys.append(_key(deleted))
+                word_ids.append(i)
+        keys = np.array(keys, dtype=np.uint32)
+        word_ids = np.array(word_ids, dtype=np.int32)
+        order = np.argsort(keys, kind="stable")
+        return cls(list(words), keys[order], word_ids[order], *encode_words(words))
+
+    @classmethod
+    def from_arrays(cls, words, arrays):
+        """Rebuilds an index over `words` from the output of `arrays` (e.g. memory-mapped)."""
+        return cls(list(words), arrays["keys"], arrays["word_ids"], arrays["lengths"], arrays["codes"])
+
+    def arrays(self):
+        return {"keys": self.keys, "word_ids": self.word_ids, "lengths": self.lengths, "codes": self.codes}
+
+    def candidates(self, word):
+        """Ids of words sharing a prefix delete with `word`, within length range."""
+        query_keys = np.array([_key(d) for d in deletes(word[:PREFIX_LENGTH])], dtype=np.uint32)
+        starts = np.searchsorted(self.keys, query_keys, side="left")
+        ends = np.searchsorted(self.keys, query_keys, side="right")
+        if not (ends > starts).any():
+            return np.empty(0, dtype=np.int32)
+        ids = np.unique(np.concatenate([self.word_ids[s:e] for s, e in zip(starts, ends) if e > s]))
+        return ids[np.abs(self.lengths[ids] - len(word)) <= MAX_EDIT_DISTANCE]
+
+    def suggest(self, word, limit=MAX_SUGGESTIONS):
+        """Returns up to `limit` known words closest to `word`, best first."""
+        forms = normalized_forms(word)
+        if not forms:
+            return []
+        exact = [form for form in forms if form in self.positions and form != word]
+        if exact:
+            return exact[:limit]
+
+        query = forms[0]
+        ids = self.candidates(query)
+        if len(ids) == 0:
+            return []
+        distances = edit_distances(query, self.codes[ids], self.lengths[ids])
+        close = distances <= MAX_EDIT_DISTANCE
+        ids, distances = ids[close], distances[close]
+        # Closest first, then most frequent (lowest id)
+        best = ids[np.lexsort((ids, distances))[:limit]]
+        return [self.words[i] for i in best.tolist()]
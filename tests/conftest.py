@@ -0,0 +1,8 @@
+import sys
+from pathlib import Path
+
+# The scripts live at the repo root and the API modules import each other plainly
+# from backend/ (as under uvicorn), so both go on the path
+BASE_DIR = Path(__file__).parent.parent.resolve()
+sys.path.insert(0, str(BASE_DIR))
+sys.path.insert(0, str(BASE_DIR / "backend"))
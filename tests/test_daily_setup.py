@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+import daily_setup
+
+@pytest.fixture
+def setup_dirs(tmp_path, monkeypatch):
+    """A pregen_data directory with one day, a manifest path and a recorded reset."""
+    (tmp_path / "pregen_data" / "2026-02-01").mkdir(parents=True)
+    manifest_path = tmp_path / "active_game.json"
+    resets = []
+    monkeypatch.setattr(daily_setup, "PREGEN_DIR", tmp_path / "pregen_data")
+    read_manifest, write_manifest = daily_setup.read_manifest, daily_setup.write_manifest
+    monkeypatch.setattr(daily_setup, "read_manifest", lambda: read_manifest(manifest_path))
+    monkeypatch.setattr(daily_setup, "write_manifest", lambda day, name: write_manifest(day, name, manifest_path))
+    monkeypatch.setattr(daily_setup, "reset_leaderboard_for", resets.append)
+    return manifest_path, resets
+
+def test_backend_activation_never_resets_the_leaderboard(setup_dirs):
+    manifest_path, resets = setup_dirs
+    assert daily_setup.activate_next_game("2026-02-01").name == "2026-02-01"
+    assert json.loads(manifest_path.read_text()) == {"date": "2026-02-01", "gameDir": "2026-02-01"}
+    assert resets == []
+
+def test_scheduled_activation_resets_only_a_new_day(setup_dirs):
+    manifest_path, resets = setup_dirs
+    manifest_path.write_text(json.dumps({"date": "2026-01-31", "gameDir": "2026-01-31"}))
+    daily_setup.activate_next_game("2026-02-01", reset_leaderboard=True)
+    assert resets == ["2026-02-01"]
+
+    # A re-run for the same day keeps the scores submitted since
+    daily_setup.activate_next_game("2026-02-01", reset_leaderboard=True)
+    assert resets == ["2026-02-01"]
@@ -0,0 +1,48 @@
+import numpy as np
+import pytest
+
+import embed_store
+from embed_store import QuantizedVectors, dequantize, load_vectors, write_vectors
+from word_lists import write_words
+from ranking import insert_into_order, rank_chunk, similarities
+
+@pytest.fixture(params=embed_store.VECTOR_DTYPES)
+def store(request, tmp_path):
+    """A small vector store on disk, as written by embed_store.py."""
+    words = [f"w{i}" for i in range(300)]
+    embeddings = np.random.default_rng(0).standard_normal((16, len(words))).astype(np.float32)
+    write_words(words, tmp_path / "word_list.txt")
+    write_vectors(words, embeddings, request.param, tmp_path / "vectors.npy", version=1)
+    return tmp_path
+
+def test_load_vectors_keeps_the_stored_codes(store):
+    words, vectors = load_vectors(store / "word_list.txt", store / "vectors.npy")
+    assert isinstance(vectors, QuantizedVectors) and len(vectors) == len(words)
+    assert isinstance(vectors.codes, np.memmap) and vectors.codes.dtype != np.float32
+    assert vectors[5].dtype == np.float32 and vectors[[5, 7]].shape == (2, 16)
+    assert np.allclose(np.linalg.norm(vectors[0:300], axis=1), 1, atol=1e-2)
+
+def test_blockwise_scoring_matches_decoded_matrix(store):
+    _, vectors = load_vectors(store / "word_list.txt", store / "vectors.npy")
+    decoded = dequantize(vectors.codes, vectors.scales)
+    queries = decoded[[0, 42, 299]]
+    assert np.allclose(similarities(vectors, queries, block_size=64), queries @ decoded.T, atol=1e-6)
+
+    targets = [0, 42, 299]
+    assert np.array_equal(rank_chunk(vectors, targets), rank_chunk(decoded, targets))
+    order = np.argsort(rank_chunk(decoded, [42])[0])
+    kept = order[~np.isin(order, [3, 77])]
+    assert np.array_equal(insert_into_order(kept, vectors, [3, 77]), order)
+
+def test_arrays_round_trip(store):
+    _, vectors = load_vectors(store / "word_list.txt", store / "vectors.npy")
+    copy = QuantizedVectors.from_arrays(vectors.arrays())
+    assert np.array_equal(copy[10:20], vectors[10:20])
+
+def test_decode_matches_blockwise_rows(store):
+    _, vectors = load_vectors(store / "word_list.txt", store / "vectors.npy")
+    decoded = vectors.decode()
+    assert isinstance(decoded, np.ndarray) and decoded.dtype == np.float32
+    assert np.array_equal(decoded, dequantize(vectors.codes, vectors.scales))
+    assert np.array_equal(np.asarray(vectors, dtype=np.float32), decoded)
+    assert np.array_equal(rank_chunk(decoded, [0, 42]), rank_chunk(vectors, [0, 42]))
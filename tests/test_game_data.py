@@ -0,0 +1,95 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+import convert_lookups
+from game_data import (
+    GameLookup, align_ranks, build_vocab, inverse_ranks, load_game, save_vocab, validate_game, vocab_positions,
+)
+
+WORDS = ["zebra", "apple", "café", "dog", "naïve", "cat"]
+
+def shuffled_lookup(words, seed=0):
+    """A legacy lookup.json dict: every word mapped to a distinct rank."""
+    ranks = list(range(len(words)))
+    random.Random(seed).shuffle(ranks)
+    return dict(zip(words, ranks))
+
+def test_vocab_positions_finds_words_and_rejects_unknown_ones():
+    vocab = build_vocab(WORDS)
+    positions = vocab_positions(vocab, WORDS + ["cow", ""])
+    assert [vocab[i].decode("utf-8") for i in positions[: len(WORDS)]] == WORDS
+    assert positions[len(WORDS):].tolist() == [-1, -1]
+    assert vocab_positions(vocab, []).tolist() == []
+
+def test_vocab_positions_never_truncates_long_words():
+    vocab = build_vocab(["cat", "zebra"])
+    # numpy would truncate these to the vocab's 5-byte width and match "zebra"
+    assert vocab_positions(vocab, ["zebras", "zebrafish"]).tolist() == [-1, -1]
+
+def test_build_vocab_rejects_duplicates():
+    with pytest.raises(ValueError):
+        build_vocab(["cat", "dog", "cat"])
+
+def test_from_dict_matches_the_lookup():
+    lookup = shuffled_lookup(WORDS)
+    game = GameLookup.from_dict(lookup)
+    validate_game(game)
+    assert {word: game[word] for word in WORDS} == lookup
+    assert game.get("cow") is None and "cow" not in game
+    assert game.ranks_for(["dog", "cow"]).tolist() == [lookup["dog"], -1]
+
+def test_from_dict_rejects_a_mismatched_vocab():
+    with pytest.raises(ValueError):
+        GameLookup.from_dict({"cat": 0, "dog": 1}, build_vocab(["cat", "dog", "cow"]))
+    with pytest.raises(ValueError):
+        GameLookup.from_dict({"cat": 0, "cow": 1}, build_vocab(["cat", "dog"]))
+
+def test_align_ranks_and_inverse_ranks():
+    vocab = build_vocab(WORDS)
+    ranks = np.arange(len(WORDS))[::-1]
+    aligned = align_ranks(ranks, WORDS, vocab)
+    game = GameLookup(vocab, aligned)
+    assert [game[word] for word in WORDS] == ranks.tolist()
+
+    order = inverse_ranks(aligned)
+    assert np.array_equal(aligned[order], np.arange(len(WORDS)))
+    assert [game.word_at(rank) for rank in range(len(WORDS))] == WORDS[::-1]
+    with pytest.raises(ValueError):
+        align_ranks(ranks[:-1], WORDS[:-1], vocab)
+
+def test_validate_game_rejects_repeated_ranks():
+    vocab = build_vocab(WORDS)
+    with pytest.raises(ValueError):
+        validate_game(GameLookup(vocab, np.zeros(len(WORDS), dtype=np.uint16)))
+
+def test_convert_lookups_round_trip(tmp_path, monkeypatch):
+    monkeypatch.setattr(convert_lookups, "PREGEN_DIR", tmp_path)
+    monkeypatch.setattr(convert_lookups, "WORD_LIST_PATH", tmp_path / "missing.txt")
+    lookups = {}
+    for seed, day in enumerate(["2026-01-01", "2026-01-02"]):
+        (tmp_path / day).mkdir()
+        lookups[day] = shuffled_lookup(WORDS, seed)
+        with open(tmp_path / day / "lookup.json", "w", encoding="utf-8") as f:
+            json.dump(lookups[day], f)
+
+    json_paths = sorted(tmp_path.glob("*/lookup.json"))
+    vocab = convert_lookups.load_shared_vocab(json_paths)
+    for json_path in json_paths:
+        convert_lookups.convert_day(json_path, vocab, with_order=True, remove_json=True)
+
+    for day, lookup in lookups.items():
+        assert not (tmp_path / day / "lookup.json").exists()
+        game = load_game(tmp_path / day)
+        validate_game(game)
+        assert game.order is not None
+        assert {word: game[word] for word in WORDS} == lookup
+        assert {rank: game.word_at(rank) for rank in range(len(WORDS))} == {rank: word for word, rank in lookup.items()}
+
+def test_save_vocab_refuses_a_different_vocabulary(tmp_path):
+    save_vocab(tmp_path / "vocab.npy", build_vocab(WORDS))
+    save_vocab(tmp_path / "vocab.npy", build_vocab(WORDS))
+    with pytest.raises(ValueError):
+        save_vocab(tmp_path / "vocab.npy", build_vocab(WORDS + ["cow"]))
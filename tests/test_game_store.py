@@ -0,0 +1,98 @@
+import json
+from datetime import date, timedelta
+
+import pytest
+
+import game_store
+import main
+import shared_data
+from game_data import GameLookup, align_ranks, build_vocab, save_vocab, write_game
+from game_store import GameStore
+
+WORDS = ["apple", "boat", "cat", "dog"]
+
+def make_game(target):
+    """A valid game over WORDS whose target (rank 0) is `target`."""
+    others = [word for word in WORDS if word != target]
+    ranks = [0 if word == target else others.index(word) + 1 for word in WORDS]
+    return GameLookup.from_dict(dict(zip(WORDS, ranks)))
+
+class CountingLoader:
+    def __init__(self, games):
+        self.games = games
+        self.loads = []
+
+    def __call__(self, day):
+        self.loads.append(day)
+        return self.games.get(day)
+
+def test_cache_evicts_least_recently_used_days():
+    days = [date(2026, 1, 1) + timedelta(days=i) for i in range(5)]
+    loader = CountingLoader({day: make_game(WORDS[i % len(WORDS)]) for i, day in enumerate(days)})
+    store = GameStore(loader, max_days=3)
+
+    for day in days[:3]:
+        store.get(day)
+    store.get(days[0]) # Now the most recently used
+    store.get(days[3])
+    store.get(days[4])
+    assert len(store._games) == 3
+    assert list(store._games) == [days[0], days[3], days[4]]
+
+    loader.loads.clear()
+    store.get(days[0])
+    store.get(days[1]) # Evicted, so loaded again
+    assert loader.loads == [days[1]]
+    assert len(store._games) == 3
+
+def test_missing_days_are_cached_briefly():
+    loader = CountingLoader({})
+    store = GameStore(loader, max_days=2, missing_ttl=60)
+    assert store.get(date(2026, 1, 1)) is None
+    assert store.get(date(2026, 1, 1)) is None
+    assert len(loader.loads) == 1
+
+    store = GameStore(loader, max_days=2, missing_ttl=0)
+    store.get(date(2026, 1, 1))
+    store.get(date(2026, 1, 1))
+    assert len(loader.loads) == 3
+
+@pytest.fixture
+def pregen(tmp_path, monkeypatch):
+    """A pregen_data directory with two games and an activation manifest, served by main."""
+    pregen_dir = tmp_path / "pregen_data"
+    vocab = build_vocab(WORDS)
+    pregen_dir.mkdir()
+    save_vocab(pregen_dir / "vocab.npy", vocab)
+    for name, target in [("game-a", "cat"), ("game-b", "boat")]:
+        ranks = make_game(target).ranks_for(WORDS)
+        write_game(pregen_dir / name, align_ranks(ranks, WORDS, vocab))
+
+    manifest_path = tmp_path / "active_game.json"
+    monkeypatch.setattr(main, "PREGEN_DIR", pregen_dir)
+    monkeypatch.setattr(main, "read_manifest", lambda: json.loads(manifest_path.read_text()))
+    monkeypatch.setattr(shared_data, "SHARED_DIR", tmp_path / "shared")
+    main.get_vocab.cache_clear()
+    yield manifest_path
+    main.get_vocab.cache_clear()
+
+def test_midnight_rollover_picks_up_the_new_manifest(pregen, monkeypatch):
+    today = date(2026, 3, 1)
+    class FakeDate(date):
+        @classmethod
+        def today(cls):
+            return today
+    monkeypatch.setattr(game_store, "date", FakeDate)
+
+    store = GameStore(main.load_game_for_date, max_days=1)
+    pregen.write_text(json.dumps({"date": str(today), "gameDir": "game-a"}))
+    assert store.today().word_at(0) == "cat"
+
+    # Midnight: the scheduled job has pointed the manifest at the next game
+    today = date(2026, 3, 2)
+    pregen.write_text(json.dumps({"date": str(today), "gameDir": "game-b"}))
+    assert store.today().word_at(0) == "boat"
+    assert store._current[0] == date(2026, 3, 2)
+    # The old day was evicted and no longer resolves (the manifest moved on)
+    assert date(2026, 3, 1) not in store._games
+    assert store.get(date(2026, 3, 1)) is None
@@ -0,0 +1,59 @@
+import asyncio
+
+import httpx
+import pytest
+
+import main
+from game_data import GameLookup
+
+# Rank r is held by the word "w<r>", so hints are easy to check
+WORDS = [f"w{rank}" for rank in range(20)]
+
+@pytest.fixture
+def lookup(monkeypatch):
+    lookup = GameLookup.from_dict({word: rank for rank, word in enumerate(WORDS)})
+    monkeypatch.setattr(main, "get_daily_lookup", lambda: lookup)
+    return lookup
+
+def get_hint(**params):
+    async def send():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.get("/api/game/hint", params=params)
+    return asyncio.run(send())
+
+def test_hint_is_the_next_word_better_than_the_best_guess(lookup):
+    response = get_hint(best=7)
+    assert response.status_code == 200
+    assert response.json() == {"word": "w6", "rank": 6}
+
+def test_repeated_hints_walk_towards_the_target_without_revealing_it(lookup):
+    best, hints = len(WORDS), []
+    while (response := get_hint(best=best)).status_code == 200:
+        hint = response.json()
+        assert 0 < hint["rank"] < best
+        hints.append(hint["rank"])
+        best = hint["rank"]
+    assert hints == list(range(len(WORDS) - 1, 0, -1))
+    assert response.status_code == 400
+
+@pytest.mark.parametrize("best", [1, 0])
+def test_no_hint_once_the_next_one_would_be_the_target(lookup, best):
+    # best=1 is the last word before the target; best=0 means the game is already won
+    response = get_hint(best=best)
+    assert response.status_code == 400
+    assert "reveal" in response.json()["detail"]
+
+def test_hint_needs_a_guess_or_a_rank(lookup):
+    # No guesses yet: nothing to improve on, so the client must ask for a rank
+    assert get_hint().status_code == 400
+    assert get_hint(rank=3, best=5).status_code == 400
+    assert get_hint(rank=3).json() == {"word": "w3", "rank": 3}
+
+@pytest.mark.parametrize("params", [{"rank": 0}, {"rank": -2}, {"rank": 20}, {"best": 21}])
+def test_hint_rank_bounds(lookup, params):
+    assert get_hint(**params).status_code == 400
+
+def test_hint_without_a_game(monkeypatch):
+    monkeypatch.setattr(main, "get_daily_lookup", lambda: None)
+    assert get_hint(best=5).status_code == 503
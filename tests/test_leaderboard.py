@@ -0,0 +1,75 @@
+import asyncio
+
+import fakeredis
+import httpx
+import pytest
+
+import main
+from write_buffer import GUESS_STREAM_KEY, MAX_BUFFERED_EVENTS, WriteBehindBuffer
+
+@pytest.fixture
+def kv(monkeypatch):
+    client = fakeredis.FakeAsyncRedis()
+    monkeypatch.setattr(main, "redis_client", client)
+    # A fresh buffer with no background flusher, like the moment right after a submit
+    monkeypatch.setattr(main, "write_buffer", WriteBehindBuffer(on_flush=main.invalidate_leaderboard_cache))
+    main.invalidate_leaderboard_cache()
+    return client
+
+async def request(method, url, **kwargs):
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        return await client.request(method, url, **kwargs)
+
+def test_submit_then_look_up_own_rank(kv):
+    async def scenario():
+        key = main.leaderboard_key_for_today()
+        await kv.zadd(key, {main.leaderboard_member(f"player{i}", f"s{i}"): i * 10 for i in range(4)})
+        submitted = await request("POST", "/api/leaderboard/submit", json={"username": "me", "score": 25, "sessionId": "mine"})
+        assert submitted.status_code == 200
+        return await request("GET", "/api/leaderboard/today/player", params={"username": "me", "sessionId": "mine"})
+
+    response = asyncio.run(scenario())
+    assert response.status_code == 200
+    assert response.json() == {"username": "me", "sessionId": "mine", "score": 25, "position": 4, "totalPlayers": 5}
+
+def test_unknown_player_is_not_found(kv):
+    response = asyncio.run(request("GET", "/api/leaderboard/today/player", params={"username": "nobody"}))
+    assert response.status_code == 404
+
+def test_guess_events_are_capped_while_kv_is_down():
+    buffer = WriteBehindBuffer()
+    for i in range(MAX_BUFFERED_EVENTS + 5):
+        buffer.add_guess("2024-01-01", f"w{i}", i)
+    assert len(buffer._events) == MAX_BUFFERED_EVENTS
+    assert buffer._events[0]["word"] == "w5"
+    assert buffer._dropped_events == 5
+
+def test_flush_writes_guess_events():
+    async def scenario():
+        client = fakeredis.FakeAsyncRedis()
+        buffer = WriteBehindBuffer()
+        buffer.add_guess("2024-01-01", "cat", 3, "s1")
+        buffer.add_guess("2024-01-01", "dgo", None, "s1")
+        assert await buffer.flush(client)
+        return await client.xrange(GUESS_STREAM_KEY)
+
+    events = [fields for _, fields in asyncio.run(scenario())]
+    assert [e[b"word"] for e in events] == [b"cat", b"dgo"]
+    assert [e[b"rank"] for e in events] == [b"3", b""]
+
+def test_bulk_guesses_are_recorded(kv, monkeypatch):
+    import numpy as np
+    from game_data import GameLookup, build_vocab
+
+    vocab = build_vocab(["cat", "dog", "fish"])
+    monkeypatch.setattr(main, "get_daily_lookup", lambda: GameLookup(vocab, np.array([0, 1, 2], dtype=np.uint16)))
+
+    async def scenario():
+        response = await request("POST", "/api/game/guesses", json={"words": ["dog", "cow"], "sessionId": "s1"})
+        assert await main.write_buffer.flush(kv)
+        return response, await kv.xrange(GUESS_STREAM_KEY)
+
+    response, events = asyncio.run(scenario())
+    assert [r["status"] for r in response.json()] == ["found", "not_in_list"]
+    assert [(e[b"word"], e[b"rank"], e[b"session"]) for _, e in events] == [(b"dog", b"1", b"s1"), (b"cow", b"", b"s1")]
@@ -0,0 +1,103 @@
+import json
+from datetime import date, datetime, timedelta, timezone
+
+import fakeredis
+import pytest
+
+import leaderboard_archive
+from leaderboard_archive import (
+    HOT_DAYS, MIN_GRACE_SECONDS, archive_leaderboards, archive_page, archive_path, archived_days, expiry_for,
+    read_archive, snapshot,
+)
+
+TODAY = date.today()
+
+def member(username, session_id=None):
+    return json.dumps({"username": username, "sessionId": session_id})
+
+def leaderboard_key(day):
+    return f"{leaderboard_archive.LEADERBOARD_PREFIX}{day}"
+
+@pytest.fixture
+def kv():
+    client = fakeredis.FakeRedis()
+    yesterday = TODAY - timedelta(days=1)
+    client.zadd(leaderboard_key(yesterday), {member("ann", "s1"): 3, member("bob", "s2"): 7, member("cy", "s3"): 5})
+    return client
+
+def test_ttl_is_set_once_and_never_pushed_back(kv, tmp_path, monkeypatch):
+    yesterday, older = TODAY - timedelta(days=1), TODAY - timedelta(days=2)
+    key = leaderboard_key(yesterday)
+    kv.zadd(leaderboard_key(older), {member("dee"): 4})
+    kv.expire(leaderboard_key(older), 1000)
+    expired = []
+    expireat = kv.expireat
+    monkeypatch.setattr(kv, "expireat", lambda name, when: expired.append(name) or expireat(name, when))
+
+    assert archive_leaderboards(kv, TODAY, tmp_path) == [older, yesterday]
+    # A TTL that was already there is left alone
+    assert expired == [key.encode()]
+    expires_at = kv.expiretime(key)
+    assert expires_at == expiry_for(yesterday, 0)
+
+    # The next run re-archives the key, including late writes, but keeps its expiry
+    kv.zadd(key, {member("late"): 9})
+    assert archive_leaderboards(kv, TODAY + timedelta(days=1), tmp_path) == [older, yesterday]
+    assert expired == [key.encode()]
+    assert kv.expiretime(key) == expires_at
+    assert read_archive(yesterday, tmp_path)["usernames"][-1] == "late"
+
+def test_expiry_for_keeps_recent_days_hot_and_gives_old_ones_a_grace_period():
+    day = date(2026, 3, 1)
+    day_end = datetime(2026, 3, 2, tzinfo=timezone.utc).timestamp()
+    # Archived right after midnight: kept for HOT_DAYS
+    assert expiry_for(day, day_end + 60) == day_end + HOT_DAYS * 86400
+    # Found long after it ended: expired after the grace period, not immediately
+    now = day_end + 30 * 86400
+    assert expiry_for(day, now) == now + MIN_GRACE_SECONDS
+    assert expiry_for(day, now) > now
+
+def test_todays_future_and_unrelated_keys_are_skipped(kv, tmp_path):
+    for key in [leaderboard_key(TODAY), leaderboard_key(TODAY + timedelta(days=1)), f"{leaderboard_archive.LEADERBOARD_PREFIX}cache"]:
+        kv.zadd(key, {member("eve"): 1})
+
+    assert archive_leaderboards(kv, TODAY, tmp_path) == [TODAY - timedelta(days=1)]
+    assert archived_days(tmp_path) == [TODAY - timedelta(days=1)]
+    assert kv.ttl(leaderboard_key(TODAY)) == -1
+    assert kv.ttl(leaderboard_key(TODAY + timedelta(days=1))) == -1
+
+def test_archiving_an_unchanged_leaderboard_writes_identical_bytes(kv, tmp_path):
+    yesterday = TODAY - timedelta(days=1)
+    archive_leaderboards(kv, TODAY, tmp_path)
+    first = archive_path(yesterday, tmp_path).read_bytes()
+    # The gzip header's timestamp (bytes 4-7) is zeroed
+    assert first[4:8] == b"\0\0\0\0"
+
+    archive_leaderboards(kv, TODAY, tmp_path)
+    assert archive_path(yesterday, tmp_path).read_bytes() == first
+
+@pytest.mark.parametrize("n_members", [0, 5, 6, 7])
+def test_snapshot_reads_across_chunk_boundaries(monkeypatch, n_members):
+    monkeypatch.setattr(leaderboard_archive, "SNAPSHOT_CHUNK_SIZE", 3)
+    client = fakeredis.FakeRedis()
+    scores = {member(f"p{i}"): i for i in range(n_members)}
+    if scores:
+        client.zadd("board", scores)
+
+    members = snapshot(client, "board")
+    assert [(json.loads(name)["username"], score) for name, score in members] == [(f"p{i}", i) for i in range(n_members)]
+
+def test_read_archive_and_pages_round_trip(kv, tmp_path):
+    yesterday = TODAY - timedelta(days=1)
+    assert read_archive(yesterday, tmp_path) is None
+    archive_leaderboards(kv, TODAY, tmp_path)
+
+    archive = read_archive(yesterday, tmp_path)
+    assert archive["date"] == str(yesterday) and archive["count"] == 3
+    assert archive["usernames"] == ["ann", "cy", "bob"] and archive["scores"] == [3, 5, 7]
+    # Session ids stay in KV
+    assert "s1" not in json.dumps(archive)
+
+    assert archive_page(archive, 0, 2) == [{"username": "ann", "score": 3}, {"username": "cy", "score": 5}]
+    assert archive_page(archive, 2, 2) == [{"username": "bob", "score": 7}]
+    assert archive_page(archive, 5, 2) == []
@@ -0,0 +1,53 @@
+import asyncio
+
+import httpx
+import numpy as np
+import pytest
+
+import main
+import shared_data
+from embed_store import load_vectors, write_vectors
+from practice import PracticeRanker
+from word_lists import write_words
+
+WORDS = ["apple", "banana", "cherry", "grape", "melon"]
+
+@pytest.fixture
+def ranker(monkeypatch):
+    vectors = np.random.default_rng(0).standard_normal((len(WORDS), 8)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    ranker = PracticeRanker(WORDS, vectors, ["banana", "melon"])
+    monkeypatch.setitem(main.practice_state, "ranker", ranker)
+    return ranker
+
+def request(method, url, **kwargs):
+    async def send():
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return await client.request(method, url, **kwargs)
+    return asyncio.run(send())
+
+def test_practice_target_ranks_itself_first(ranker):
+    lookup = main.get_practice_lookup("t2")
+    assert lookup.word_at(0) == "cherry" and lookup["cherry"] == 0
+    assert main.get_practice_lookup("r7").word_at(0) in ("banana", "melon")
+
+@pytest.mark.parametrize("game_id", ["t²", "t١", "r", "x1", "t-1", "t5", "t 1"])
+def test_malformed_practice_ids_are_not_found(ranker, game_id):
+    response = request("POST", f"/api/practice/{game_id}/guess", json={"word": "apple"})
+    assert response.status_code == 404
+
+def test_shared_practice_ranker_uses_decoded_vectors(tmp_path, monkeypatch):
+    vectors = np.random.default_rng(0).standard_normal((8, len(WORDS))).astype(np.float32)
+    write_words(WORDS, tmp_path / "word_list.txt")
+    write_vectors(WORDS, vectors, "int8", tmp_path / "vectors.npy", version=1)
+    monkeypatch.setattr(main, "WORD_LIST_PATH", tmp_path / "word_list.txt")
+    monkeypatch.setattr(main, "VECTORS_PATH", tmp_path / "vectors.npy")
+    monkeypatch.setattr(main, "DRAWABLE_LIST_PATH", tmp_path / "missing.txt")
+    monkeypatch.setattr(shared_data, "SHARED_DIR", tmp_path / "shared")
+
+    ranker = main.load_shared_practice_ranker()
+    assert ranker.vectors.dtype == np.float32 and ranker.vectors.shape == (len(WORDS), 8)
+    expected = load_vectors(tmp_path / "word_list.txt", tmp_path / "vectors.npy")[1].decode()
+    assert np.array_equal(ranker.vectors, expected)
+    assert ranker.lookup_for_target(0).word_at(0) == WORDS[0]
@@ -0,0 +1,72 @@
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import pregenerate_data
+import ranking
+from game_data import build_vocab, load_game
+from pregenerate_data import DayJob, TargetVetter
+
+WORDS = ["cat", "dog", "sun", "tree", "house"]
+
+def make_vetter(monkeypatch, difficulties, spares):
+    """A vetter whose difficulty is looked up per target (the target has rank 0)."""
+    normalized = np.eye(len(WORDS), dtype=np.float32)
+    vetter = TargetVetter(WORDS, normalized, (4, 6), spares)
+    measured = []
+    def difficulty(ranks):
+        target = int(np.argmin(ranks))
+        measured.append(WORDS[target])
+        return difficulties[WORDS[target]]
+    monkeypatch.setattr(vetter, "difficulty", difficulty)
+    return vetter, measured
+
+def vet(vetter, index):
+    job = DayJob(Path("2026-01-01"), WORDS[index], index, True, False)
+    ranks = pregenerate_data.rank_chunk(vetter.normalized, [index])[0]
+    return vetter.vet(job, ranks)
+
+def test_vet_keeps_target_in_range(monkeypatch):
+    vetter, measured = make_vetter(monkeypatch, {"cat": 5}, [1, 2])
+    job, _ = vet(vetter, 0)
+    assert job.word == "cat" and measured == ["cat"]
+
+def test_vet_replaces_out_of_range_target(monkeypatch):
+    vetter, measured = make_vetter(monkeypatch, {"cat": 12, "sun": 9, "dog": 6}, [1, 2])
+    job, ranks = vet(vetter, 0)
+    assert job.word == "dog" and int(np.argmin(ranks)) == 1
+    assert measured == ["cat", "sun", "dog"]
+
+def test_vet_measures_last_replacement_and_keeps_closest(monkeypatch):
+    monkeypatch.setattr(pregenerate_data, "MAX_REPLACEMENTS", 2)
+    vetter, measured = make_vetter(monkeypatch, {"cat": 12, "house": 7, "tree": 20, "sun": 9}, [2, 3, 4])
+    job, ranks = vet(vetter, 0)
+    # Every candidate, including the final replacement, is measured
+    assert measured == ["cat", "house", "tree"]
+    assert job.word == "house" and int(np.argmin(ranks)) == 4
+
+def test_lookup_stage_ranks_small_chunks_on_the_pool(tmp_path, monkeypatch):
+    monkeypatch.setattr(ranking, "PARALLEL_THRESHOLD", 100)
+    submitted = []
+    class CountingPool(ProcessPoolExecutor):
+        def submit(self, fn, *args, **kwargs):
+            submitted.append(len(args[0]))
+            return super().submit(fn, *args, **kwargs)
+    monkeypatch.setattr(ranking, "ProcessPoolExecutor", CountingPool)
+
+    rng = np.random.default_rng(0)
+    normalized = rng.standard_normal((200, 8)).astype(np.float32)
+    normalized /= np.linalg.norm(normalized, axis=1, keepdims=True)
+    words = [f"w{i:03d}" for i in range(len(normalized))]
+    vocab = build_vocab(words)
+    # More targets than the threshold, but every chunk is smaller than it
+    jobs = [DayJob(tmp_path / f"day-{i:03d}", words[i], i, True, False) for i in range(150)]
+    pregenerate_data.run_pipeline(jobs, words, vocab, normalized, workers=2)
+
+    assert submitted == [pregenerate_data.LOOKUP_CHUNK_SIZE] * 2 + [150 % pregenerate_data.LOOKUP_CHUNK_SIZE]
+    expected = pregenerate_data.rank_chunk(normalized, [job.index for job in jobs])
+    for job, ranks in zip(jobs, expected):
+        game = load_game(job.day_dir, vocab)
+        assert game.word_at(0) == job.word
+        assert np.array_equal(game.ranks_for(words), ranks)
@@ -0,0 +1,33 @@
+import os
+import shutil
+
+import numpy as np
+
+import shared_data
+
+def publish(shared_dir, name, value):
+    return shared_data.attach(name, "v1", lambda: {"values": np.array([value])}, shared_dir)
+
+def test_attach_builds_once(tmp_path):
+    assert publish(tmp_path, "game-a", 1)["values"].tolist() == [1]
+    # Already published: the build isn't called again
+    assert shared_data.attach("game-a", "v1", lambda: 1 / 0, tmp_path)["values"].tolist() == [1]
+
+def test_prune_removes_old_entries_and_their_locks(tmp_path):
+    for i in range(4):
+        publish(tmp_path, f"game-{i}", i)
+        os.utime(tmp_path / f"game-{i}-v1" / shared_data.META_FILENAME, (i, i))
+    shared_data.prune("game-", 2, tmp_path)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["game-2-v1", "game-2.lock", "game-3-v1", "game-3.lock"]
+
+def test_attach_republishes_when_pruned_mid_attach(tmp_path, monkeypatch):
+    publish(tmp_path, "game-a", 1)
+    open_arrays = shared_data._open_arrays
+
+    def pruned_first(data_dir):
+        monkeypatch.setattr(shared_data, "_open_arrays", open_arrays)
+        shutil.rmtree(data_dir)
+        raise FileNotFoundError(data_dir)
+
+    monkeypatch.setattr(shared_data, "_open_arrays", pruned_first)
+    assert publish(tmp_path, "game-a", 2)["values"].tolist() == [2]
@@ -0,0 +1,59 @@
+import random
+
+import numpy as np
+
+from suggestions import SuggestionIndex, deletes, edit_distances, encode_words
+
+def osa_distance(a, b):
+    """Textbook optimal string alignment distance, the reference for edit_distances."""
+    d = [[0] * (len(b) + 1) for _ in range(len(a) + 1)]
+    for i in range(len(a) + 1):
+        d[i][0] = i
+    for j in range(len(b) + 1):
+        d[0][j] = j
+    for i in range(1, len(a) + 1):
+        for j in range(1, len(b) + 1):
+            d[i][j] = min(d[i - 1][j] + 1, d[i][j - 1] + 1, d[i - 1][j - 1] + (a[i - 1] != b[j - 1]))
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                d[i][j] = min(d[i][j], d[i - 2][j - 2] + 1)
+    return d[len(a)][len(b)]
+
+def test_edit_distances_match_reference():
+    rng = random.Random(0)
+    for _ in range(300):
+        query = "".join(rng.choice("abcd") for _ in range(rng.randint(1, 7)))
+        # Only words within the length window edit_distances computes
+        words = ["".join(rng.choice("abcd") for _ in range(rng.randint(max(1, len(query) - 2), len(query) + 2))) for _ in range(10)]
+        lengths, codes = encode_words(words)
+        expected = [osa_distance(query, word) for word in words]
+        assert edit_distances(query, codes, lengths).tolist() == expected
+
+def test_edit_distances_count_transpositions_once():
+    lengths, codes = encode_words(["form", "from", "fro"])
+    assert edit_distances("form", codes, lengths).tolist() == [0, 1, 2]
+
+def test_deletes():
+    assert deletes("cat", 1) == {"cat", "at", "ct", "ca"}
+    assert "t" in deletes("cat", 2)
+
+def test_suggest_finds_close_words_most_frequent_first():
+    index = SuggestionIndex.build(["house", "horse", "mouse", "elephant"])
+    # house and horse are one edit away, mouse two
+    assert index.suggest("hourse") == ["house", "horse", "mouse"]
+    assert index.suggest("elefant") == ["elephant"]
+    assert index.suggest("xyzzy") == []
+
+def test_suggest_prefers_case_and_plural_forms():
+    index = SuggestionIndex.build(["cat", "cats", "dog"])
+    assert index.suggest("Dogs") == ["dog"]
+
+def test_suggest_ignores_blank_guesses():
+    index = SuggestionIndex.build(["s", "es", "cat"])
+    assert index.suggest("") == []
+    assert index.suggest("   ") == []
+
+def test_index_survives_round_trip_through_arrays():
+    words = ["apple", "apply", "ample"]
+    index = SuggestionIndex.build(words)
+    rebuilt = SuggestionIndex.from_arrays(words, {k: np.array(v) for k, v in index.arrays().items()})
+    assert rebuilt.suggest("appel") == index.suggest("appel")
@@ -0,0 +1,31 @@
+import numpy as np
+
+from update_vocab import STAGED_SUFFIX, finish_swap, stage
+
+def make_day(pregen_dir, name, value):
+    day_dir = pregen_dir / name
+    day_dir.mkdir(parents=True)
+    np.save(day_dir / "ranks.npy", np.array([value]))
+    return day_dir
+
+def test_finish_swap_completes_an_interrupted_swap(tmp_path):
+    days = [make_day(tmp_path, f"2026-01-0{i}", 0) for i in range(1, 4)]
+    np.save(tmp_path / "vocab.npy", np.array([0]))
+    for day_dir in days:
+        stage(day_dir / "ranks.npy", np.array([1]))
+    stage(tmp_path / "vocab.npy", np.array([1]))
+    # The first day was already swapped in when the run stopped
+    (days[0] / ("ranks.npy" + STAGED_SUFFIX)).replace(days[0] / "ranks.npy")
+
+    finish_swap(tmp_path)
+    assert [np.load(day_dir / "ranks.npy").tolist() for day_dir in days] == [[1], [1], [1]]
+    assert np.load(tmp_path / "vocab.npy").tolist() == [1]
+    assert not list(tmp_path.glob(f"**/*{STAGED_SUFFIX}"))
+
+def test_finish_swap_discards_incomplete_staging(tmp_path):
+    day_dir = make_day(tmp_path, "2026-01-01", 0)
+    stage(day_dir / "ranks.npy", np.array([1]))
+
+    finish_swap(tmp_path)
+    assert np.load(day_dir / "ranks.npy").tolist() == [0]
+    assert not list(tmp_path.glob(f"**/*{STAGED_SUFFIX}"))
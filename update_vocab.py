@@ -0,0 +1,177 @@
+"""
+Adds words to (or removes words from) the vocabulary without rebuilding everything.
+
+Only the added words are embedded; every other column of embed_store.npy is kept.
+Pregenerated days are patched in place instead of re-ranked: removed words drop
+out of each day's ranking and every added word is slotted into it by binary search
+against the day's target, so the relative order of the existing words never
+changes. The new rank arrays and vocab.npy are staged next to the old ones and
+swapped in together at the end. What gets patched is worked out from vocab.npy
+versus word_list.txt, so if a run stops after the embeddings were updated, running
+it again (with or without the same arguments) patches the days.
+
+Days still stored as lookup.json only are left alone (run convert_lookups.py
+first), and words that are the target of a pregenerated day can't be removed.
+"""
+import argparse
+import os
+import numpy as np
+from pathlib import Path
+
+from embed_store import load_store, load_vectors
+from word_lists import read_words, write_words
+from game_data import VOCAB_FILENAME, RANKS_FILENAME, ORDER_FILENAME, JSON_FILENAME, build_vocab, load_vocab, inverse_ranks, align_ranks
+from ranking import insert_into_order
+
+# Setup paths
+BASE_DIR = Path(__file__).parent.resolve()
+PREGEN_DIR = BASE_DIR / "backend" / "pregen_data"
+DRAWABLE_LIST_PATH = BASE_DIR / "drawable_words.txt"
+
+# Suffix of the staged files that replace the live ones once every day is patched
+STAGED_SUFFIX = ".next"
+
+def read_word_args(words, path):
+    result = list(words or [])
+    if path is not None:
+        result += read_words(path)
+    return list(dict.fromkeys(result))
+
+def game_days(pregen_dir=PREGEN_DIR):
+    """Day directories holding a binary game, plus the legacy JSON-only ones."""
+    binary, legacy = [], []
+    for day_dir in sorted(p for p in pregen_dir.iterdir() if p.is_dir()):
+        if (day_dir / RANKS_FILENAME).exists():
+            binary.append(day_dir)
+        elif (day_dir / JSON_FILENAME).exists():
+            legacy.append(day_dir)
+    return binary, legacy
+
+def patch_day(ranks, old_vocab_rows, new_rows, normalized):
+    """
+    Returns the word_list-ordered rank array for one day. `ranks` is aligned with
+    the old vocab, `old_vocab_rows` maps old vocab indices to rows of `normalized`
+    (-1 for removed words) and `new_rows` are the rows the day doesn't rank yet.
+    """
+    order = old_vocab_rows[inverse_ranks(ranks).astype(np.int64)]
+    order = insert_into_order(order[order >= 0], normalized, new_rows)
+    patched = np.empty(len(normalized), dtype=np.int64)
+    patched[order] = np.arange(len(order))
+    return patched
+
+def stage(path, array):
+    """Writes `array` next to `path` under the staged name and returns that name."""
+    staged = path.with_name(path.name + STAGED_SUFFIX)
+    # Through a file object: np.save on a path would append .npy to the staged name
+    with open(staged, "wb") as f:
+        np.save(f, array)
+    return staged
+
+def finish_swap(pregen_dir=PREGEN_DIR):
+    """
+    Completes a swap an earlier run was interrupted in. vocab.npy is staged last and
+    swapped in last, so its staged copy exists exactly when every file was staged
+    but not all were swapped in; staged files without it are discarded.
+    """
+    staged = sorted(pregen_dir.glob(f"*/*{STAGED_SUFFIX}"))
+    staged_vocab = pregen_dir / (VOCAB_FILENAME + STAGED_SUFFIX)
+    if staged_vocab.exists():
+        print(f"Finishing the swap of {len(staged) + 1} files staged by an interrupted run.")
+        for path in staged + [staged_vocab]:
+            os.replace(path, path.with_name(path.name[: -len(STAGED_SUFFIX)]))
+    else:
+        for path in staged:
+            path.unlink()
+
+def main():
+    parser = argparse.ArgumentParser(description="Add or remove vocabulary words, embedding only the new ones and patching pregenerated days.")
+    parser.add_argument("--add", nargs="+", default=None, help="Words to add.")
+    parser.add_argument("--add-file", type=Path, default=None, help="File with one word to add per line.")
+    parser.add_argument("--remove", nargs="+", default=None, help="Words to remove.")
+    parser.add_argument("--remove-file", type=Path, default=None, help="File with one word to remove per line.")
+    parser.add_argument("--batch-size", type=int, default=512, help="Words encoded per model call.")
+    args = parser.parse_args()
+
+    if PREGEN_DIR.exists():
+        finish_swap()
+    try:
+        old_words, store = load_store()
+    except ValueError as e:
+        raise SystemExit(str(e))
+
+    known = set(old_words)
+    to_add = [w for w in read_word_args(args.add, args.add_file) if w not in known]
+    to_remove = set(read_word_args(args.remove, args.remove_file)) & known
+    keep = [i for i, word in enumerate(old_words) if word not in to_remove]
+    words = [old_words[i] for i in keep] + to_add
+
+    # Days are patched from the difference between vocab.npy and the word list, not
+    # from the arguments, so rerunning after an interrupted patch finishes the job
+    binary_days, legacy_days = game_days() if PREGEN_DIR.exists() else ([], [])
+    old_vocab = load_vocab(PREGEN_DIR / VOCAB_FILENAME, mmap=False) if binary_days else None
+    new_vocab = build_vocab(words)
+    days_current = old_vocab is None or np.array_equal(old_vocab, new_vocab)
+    if not to_add and not to_remove and days_current:
+        print("Nothing to do: every word to add is already known and no word to remove is.")
+        return
+    for day_dir in legacy_days:
+        print(f"Warning: {day_dir.name} only has {JSON_FILENAME}; it keeps its old vocabulary (run convert_lookups.py first to patch it).")
+
+    # Each day is ranked against its target, so targets have to stay
+    if not days_current:
+        kept = set(words)
+        targets = {
+            day_dir.name: old_vocab[int(np.argmin(np.load(day_dir / RANKS_FILENAME, mmap_mode="r")))].decode("utf-8")
+            for day_dir in binary_days
+        }
+        in_use = {day: word for day, word in targets.items() if word not in kept}
+        if in_use:
+            raise SystemExit("Can't remove targets of pregenerated days: " + ", ".join(f"{w} ({d})" for d, w in sorted(in_use.items())))
+
+    # --- Embeddings: keep every surviving column, embed only the additions ---
+    if to_add or to_remove:
+        print(f"Removing {len(to_remove)} and adding {len(to_add)} words ({len(old_words)} -> {len(words)}).")
+        from create_embeddings import embed_words
+        embed_words(words, existing_store=store[:, keep], batch_size=args.batch_size)
+    del store
+    # Patch against the same vectors pregenerate_data.py ranks new days with
+    words, normalized = load_vectors()
+
+    # Drawable words are picked from the word list, so drop the ones that left it
+    if DRAWABLE_LIST_PATH.exists():
+        kept = set(words)
+        drawable = read_words(DRAWABLE_LIST_PATH)
+        kept_drawable = [w for w in drawable if w in kept]
+        if len(kept_drawable) != len(drawable):
+            write_words(kept_drawable, DRAWABLE_LIST_PATH)
+            print(f"Removed {len(drawable) - len(kept_drawable)} words from {DRAWABLE_LIST_PATH.name}.")
+
+    if not binary_days:
+        print("No binary pregenerated days to patch.")
+        return
+    if days_current:
+        print("Pregenerated days already match the word list.")
+        return
+
+    # --- Patch every day, staging the results next to the live files ---
+    row_of = {word: i for i, word in enumerate(words)}
+    old_vocab_rows = np.array([row_of.get(w.decode("utf-8"), -1) for w in old_vocab], dtype=np.int64)
+    new_rows = np.setdiff1d(np.arange(len(words)), old_vocab_rows[old_vocab_rows >= 0])
+
+    staged = []
+    print(f"Patching {len(binary_days)} days...")
+    for day_dir in binary_days:
+        ranks = np.load(day_dir / RANKS_FILENAME, mmap_mode="r")
+        aligned = align_ranks(patch_day(ranks, old_vocab_rows, new_rows, normalized), words, new_vocab)
+        staged.append(stage(day_dir / RANKS_FILENAME, aligned))
+        if (day_dir / ORDER_FILENAME).exists():
+            staged.append(stage(day_dir / ORDER_FILENAME, inverse_ranks(aligned)))
+    staged.append(stage(PREGEN_DIR / VOCAB_FILENAME, new_vocab))
+
+    # Swap everything in at once so the vocabulary and rank arrays stay aligned
+    for path in staged:
+        os.replace(path, path.with_name(path.name[: -len(STAGED_SUFFIX)]))
+    print(f"Patched {len(binary_days)} days; vocabulary is now {len(new_vocab)} words.")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,16 @@
+"""
+Plain-text word lists (word_list.txt, drawable_words.txt, ...): one word per
+line, blank lines ignored. Standard library only, so anything can read them
+without pulling in the embedding code.
+"""
+from atomic_files import atomic_write
+
+def read_words(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+def write_words(words, path):
+    """Writes one word per line, atomically."""
+    with atomic_write(path, "w", encoding="utf-8") as f:
+        for word in words:
+            f.write(word + "\n")